@@ -0,0 +1,143 @@
+"""
+Load-test suite: requests per second and p50/p95/p99 latency for each scenario.
+
+Runs in-process through `ASGITransport` by default, or against a running server with `--url`
+(start it with the same DATABASE_URL, e.g. `uvicorn src.main:app`). Results are compared with a
+baseline JSON and any scenario whose throughput drops, or whose latency grows, by more than
+`--tolerance` fails the run with exit status 1, as does a missing baseline. Baselines are
+machine-specific: record one on the machine that runs the comparison.
+
+    python -m benchmarks                                   # all scenarios
+    python -m benchmarks -s login -s users_me -c 32        # some scenarios, 32 concurrent clients
+    python -m benchmarks --save-baseline                   # record benchmarks/baseline.json
+    python -m benchmarks --url http://127.0.0.1:8000
+    TRANSACTION_COALESCING=true python -m benchmarks -s transaction_hot -c 64
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+
+from benchmarks.common import Timer, bench_client, login_headers, percentiles, remote_client
+from benchmarks.scenarios import SCENARIOS, Send
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+async def run_scenario(client, send: Send, requests: int, concurrency: int) -> dict:
+    warmup = min(50, requests // 10)
+    for i in range(warmup):
+        await send(client, i)
+
+    latencies: list[float] = []
+    errors = 0
+    counter = itertools.count(warmup)
+    last = warmup + requests
+
+    async def worker() -> None:
+        nonlocal errors
+        while (i := next(counter)) < last:
+            start = time.perf_counter()
+            response = await send(client, i)
+            latencies.append(time.perf_counter() - start)
+            if response.is_error:
+                errors += 1
+
+    with Timer() as timer:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": requests / timer.elapsed,
+        **{f"{key}_ms": value * 1000 for key, value in percentiles(latencies).items()},
+    }
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], tolerance: float) -> list[str]:
+    regressions = []
+    for name, result in results.items():
+        if result["errors"]:
+            regressions.append(f"{name}: {result['errors']} of {result['requests']} requests failed")
+
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if result["rps"] < expected["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: {result['rps']:.1f} req/s, baseline {expected['rps']:.1f} req/s")
+        for key in LATENCY_KEYS:
+            if result[key] > expected[key] * (1 + tolerance):
+                regressions.append(f"{name}: {key} {result[key]:.2f} ms, baseline {expected[key]:.2f} ms")
+    return regressions
+
+
+def show(name: str, result: dict) -> None:
+    latencies = "  ".join(f"{key[:3]}={result[key]:8.2f} ms" for key in LATENCY_KEYS)
+    print(f"{name:<20} {result['requests']:>7} req  {result['rps']:9.1f} req/s  {latencies}  errors={result['errors']}")
+
+
+async def main(args: argparse.Namespace) -> int:
+    from src.config import settings
+
+    client_factory = remote_client(args.url) if args.url else bench_client()
+    results = {}
+    async with client_factory as client:
+        headers = await login_headers(client)
+        for name in args.scenario or SCENARIOS:
+            scenario = SCENARIOS[name]
+            send = await scenario.setup(client, headers)
+            results[name] = await run_scenario(client, send, args.requests or scenario.requests, args.concurrency)
+            show(name, results[name])
+
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "target": args.url or "asgi",
+            "concurrency": args.concurrency,
+            "bcrypt_rounds": settings.bcrypt_rounds,
+        },
+        "scenarios": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        # Nothing to compare with is a failure, not a pass: a CI job must not go green silently.
+        print(f"\nERROR: no baseline at {args.baseline}; record one with --save-baseline", file=sys.stderr)
+        return 1
+
+    baseline = json.loads(args.baseline.read_text())["scenarios"]
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("\nREGRESSIONS:", file=sys.stderr)
+        for regression in regressions:
+            print(f"  {regression}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Load-test the bank API.")
+    parser.add_argument("-s", "--scenario", action="append", choices=SCENARIOS, help="scenario to run (repeatable; default: all)")
+    parser.add_argument("-n", "--requests", type=int, help="requests per scenario (default: per scenario)")
+    parser.add_argument("-c", "--concurrency", type=int, default=16, help="concurrent clients (default: 16)")
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="baseline JSON to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results to --baseline instead of comparing")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression (default: 0.2)")
+    parser.add_argument("--output", type=Path, help="also write the results to this JSON file")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,44 @@
+"""
+Throughput of `POST /accounts/bulk` and `GET /accounts?ids=...` against one request per account.
+
+    python -m benchmarks.bench_account_bulk [items]
+"""
+import asyncio
+import sys
+
+from benchmarks.common import Timer, bench_client, login_headers, report
+
+IDS_PER_REQUEST = 1000
+
+
+async def main(items: int) -> None:
+    async with bench_client() as client:
+        headers = await login_headers(client)
+        payload = [{"user_id": 1, "balance": 1} for _ in range(items)]
+
+        with Timer() as timer:
+            for item in payload:
+                await client.post("/accounts/", json=item, headers=headers)
+        report("POST /accounts/ (per item)", items, timer.elapsed)
+
+        with Timer() as timer:
+            response = await client.post("/accounts/bulk", json=payload, headers=headers)
+        report("POST /accounts/bulk", items, timer.elapsed)
+
+        # Read back the accounts created by the bulk request, in reverse order.
+        ids = [account["id"] for account in reversed(response.json())]
+
+        with Timer() as timer:
+            for id in ids:
+                await client.get(f"/accounts/{id}", headers=headers)
+        report("GET /accounts/{id} (per item)", items, timer.elapsed)
+
+        with Timer() as timer:
+            for start in range(0, len(ids), IDS_PER_REQUEST):
+                params = {"ids": ",".join(map(str, ids[start:start + IDS_PER_REQUEST]))}
+                await client.get("/accounts/", params=params, headers=headers)
+        report(f"GET /accounts?ids=... ({IDS_PER_REQUEST} per request)", items, timer.elapsed)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
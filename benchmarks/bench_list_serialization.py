@@ -0,0 +1,46 @@
+"""
+CPU time per 1,000-row page of the list endpoints, measured in-process with `time.process_time`.
+
+    python -m benchmarks.bench_list_serialization [pages]
+"""
+import asyncio
+import sys
+import time
+
+from benchmarks.common import bench_client, create_account, login_headers, seed_transactions
+
+PAGE_SIZE = 1000
+
+
+async def main(pages: int) -> None:
+    from src.database import database
+    from src.models.account import accounts
+    from src.models.user import users
+
+    async with bench_client() as client:
+        headers = await login_headers(client)
+        account_id = await create_account(balance=1)
+        await database.execute_many(accounts.insert(), [{"user_id": 1, "balance": 1.5} for _ in range(PAGE_SIZE)])
+        await database.execute_many(
+            users.insert(), [{"name": f"User {i}", "cpf": f"{i:011d}", "password": "x", "role_id": "CLIENT"} for i in range(PAGE_SIZE)]
+        )
+        seed_transactions(account_id, PAGE_SIZE)
+
+        endpoints = {
+            "GET /users/": ("/users/", {"limit": PAGE_SIZE}),
+            "GET /accounts/": ("/accounts/", {"limit": PAGE_SIZE}),
+            "GET /transactions/{account_id}": (f"/transactions/{account_id}", {"limit": PAGE_SIZE}),
+        }
+        for name, (url, params) in endpoints.items():
+            response = await client.get(url, params=params, headers=headers)
+            assert response.status_code == 200, response.text
+
+            start = time.process_time()
+            for _ in range(pages):
+                await client.get(url, params=params, headers=headers)
+            elapsed = time.process_time() - start
+            print(f"{name:<40} {elapsed / pages * 1000:8.2f} ms CPU per {PAGE_SIZE}-row page")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 50))
@@ -0,0 +1,56 @@
+"""
+Latency of `GET /accounts/me` while a burst of logins runs at the same time.
+
+bcrypt runs in `password_executor`, so the event loop keeps serving other requests during a login
+flood. Tune with BCRYPT_ROUNDS and PASSWORD_HASH_WORKERS.
+
+    python -m benchmarks.bench_login_contention [concurrent_logins]
+"""
+import asyncio
+import sys
+import time
+
+from benchmarks.common import bench_client, create_account, login_headers, percentiles
+
+SAMPLES = 300
+
+
+async def sample_latencies(client, headers) -> list[float]:
+    latencies = []
+    for _ in range(SAMPLES):
+        start = time.perf_counter()
+        await client.get("/accounts/me", headers=headers)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def login_forever(client, stop: asyncio.Event) -> int:
+    logins = 0
+    while not stop.is_set():
+        await client.post("/auth/login", json={"cpf": "99999999999", "password": "bench1234"})
+        logins += 1
+    return logins
+
+
+def show(name: str, latencies: list[float]) -> None:
+    summary = "  ".join(f"{key}={value * 1000:7.2f} ms" for key, value in percentiles(latencies).items())
+    print(f"{name:<22} {summary}")
+
+
+async def main(concurrent_logins: int) -> None:
+    async with bench_client() as client:
+        headers = await login_headers(client)
+        await create_account(balance=100)
+
+        show("idle", await sample_latencies(client, headers))
+
+        stop = asyncio.Event()
+        flood = [asyncio.create_task(login_forever(client, stop)) for _ in range(concurrent_logins)]
+        await asyncio.sleep(0.1)
+        show(f"{concurrent_logins} logins in flight", await sample_latencies(client, headers))
+        stop.set()
+        print(f"logins completed: {sum(await asyncio.gather(*flood))}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 16))
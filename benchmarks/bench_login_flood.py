@@ -0,0 +1,104 @@
+"""
+Latency of `GET /accounts/me` during a credential-stuffing flood: wrong passwords for many real
+CPFs from many client addresses, sent at a fixed rate, with login admission control off and on.
+
+Without it every attempt queues a bcrypt verification, so the backlog and the CPU spent on it
+grow for as long as the flood lasts, and a legitimate login waits behind all of it. With it
+attempts over the per-IP and per-CPF rates, or over LOGIN_MAX_CONCURRENT_VERIFICATIONS, get an
+immediate 429 and the backlog stays bounded.
+
+The flood is open-loop: attempts keep arriving whether or not earlier ones were answered, as
+they would from outside.
+
+    python -m benchmarks.bench_login_flood [attempts_per_second]
+"""
+import asyncio
+import random
+import sys
+import time
+from collections import Counter
+
+from httpx import ASGITransport, AsyncClient
+
+from benchmarks.bench_login_contention import sample_latencies, show
+from benchmarks.common import bench_client, create_account, login_headers
+
+USERS = 500
+ADDRESSES = 256
+
+
+async def flood(clients: list[AsyncClient], cpfs: list[str], rate: int, stop: asyncio.Event, outcomes: Counter) -> None:
+    async def attempt() -> None:
+        response = await random.choice(clients).post("/auth/login", json={"cpf": random.choice(cpfs), "password": "guess1234"})
+        outcomes[response.status_code] += 1
+
+    pending: set[asyncio.Task] = set()
+    try:
+        while not stop.is_set():
+            task = asyncio.create_task(attempt())
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+            await asyncio.sleep(1 / rate)
+    finally:
+        outcomes["unanswered"] = len(pending)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def sample_logins(client: AsyncClient, samples: int = 3, timeout: float = 5) -> str:
+    """Logs the benchmark user in a few times, as a legitimate client would during the flood."""
+    results = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(client.post("/auth/login", json={"cpf": "99999999999", "password": "bench1234"}), timeout)
+        except TimeoutError:
+            results.append(f"no answer after {timeout:.0f} s")
+            continue
+        results.append(f"{response.status_code} in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return ", ".join(results)
+
+
+async def main(rate: int) -> None:
+    from src.database import database
+    from src.main import app
+    from src.models.user import users
+    from src.ratelimit import limiters
+    from src.security.auth import hash_password
+
+    async with bench_client() as client:
+        headers = await login_headers(client)
+        await create_account(balance=100)
+
+        password = hash_password("bench1234")
+        cpfs = [f"{i:011d}" for i in range(USERS)]
+        await database.execute_many(users.insert(), [{"name": "Victim", "cpf": cpf, "password": password, "role_id": "CLIENT"} for cpf in cpfs])
+        clients = [
+            AsyncClient(base_url="http://bench", transport=ASGITransport(app=app, client=(f"10.0.{i // 256}.{i % 256}", 1234)))
+            for i in range(ADDRESSES)
+        ]
+
+        show("idle", await sample_latencies(client, headers))
+
+        for enabled in (False, True):
+            for limiter in limiters.values():
+                limiter.enabled = enabled
+                limiter.clear()
+
+            stop = asyncio.Event()
+            outcomes = Counter()
+            task = asyncio.create_task(flood(clients, cpfs, rate, stop, outcomes))
+            await asyncio.sleep(1)
+            show(f"flood, control {'on' if enabled else 'off'}", await sample_latencies(client, headers))
+            print(f"{'':<22} own logins: {await sample_logins(client)}")
+            stop.set()
+            await task
+            print(f"{'':<22} login responses: {dict(outcomes)}")
+
+        for flood_client in clients:
+            await flood_client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
@@ -0,0 +1,38 @@
+"""
+Cost of the `login_required` dependency chain (JWTBearer -> get_current_user -> login_required),
+with the verified-token cache cold on every call and warm.
+
+    python -m benchmarks.bench_login_required [iterations]
+"""
+import asyncio
+import sys
+
+from benchmarks.common import Timer
+
+
+async def main(iterations: int) -> None:
+    from starlette.requests import Request
+
+    from src.security.auth import JWTBearer, get_current_user, login_required, sign_jwt, token_cache
+
+    token = sign_jwt(user_id="1", role="CLIENT")["access_token"]
+    request = Request({"type": "http", "headers": [(b"authorization", f"Bearer {token}".encode())]})
+    bearer = JWTBearer()
+
+    async def resolve() -> None:
+        login_required(await get_current_user(await bearer(request)))
+
+    for name, cold in (("cold cache", True), ("warm cache", False)):
+        token_cache.clear()
+        with Timer() as timer:
+            for _ in range(iterations):
+                if cold:
+                    token_cache.clear()
+                await resolve()
+        print(f"{name:<12} {timer.elapsed / iterations * 1_000_000:8.2f} µs/call")
+
+    print(f"hits={token_cache.hits} misses={token_cache.misses}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000))
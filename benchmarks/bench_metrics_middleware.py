@@ -0,0 +1,51 @@
+"""
+Per-request overhead of `MetricsMiddleware`, measured around a trivial ASGI app so that only the
+middleware's own work is timed.
+
+    python -m benchmarks.bench_metrics_middleware [requests]
+"""
+import asyncio
+import sys
+from types import SimpleNamespace
+
+from benchmarks.common import Timer
+
+ROUTE = SimpleNamespace(path="/transactions/{account_id}")
+START = {"type": "http.response.start", "status": 200, "headers": []}
+BODY = {"type": "http.response.body", "body": b""}
+
+
+async def app(scope, receive, send):
+    scope["route"] = ROUTE
+    await send(START)
+    await send(BODY)
+
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message):
+    pass
+
+
+async def run(target, requests: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/transactions/1"}
+    with Timer() as timer:
+        for _ in range(requests):
+            await target(dict(scope), receive, send)
+    return timer.elapsed / requests
+
+
+async def main(requests: int) -> None:
+    from src.metrics import MetricsMiddleware
+
+    bare = await run(app, requests)
+    instrumented = await run(MetricsMiddleware(app), requests)
+    print(f"bare app          {bare * 1_000_000:8.2f} µs/request")
+    print(f"with middleware   {instrumented * 1_000_000:8.2f} µs/request")
+    print(f"overhead          {(instrumented - bare) * 1_000_000:8.2f} µs/request")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000))
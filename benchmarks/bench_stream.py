@@ -0,0 +1,58 @@
+"""
+Memory per idle `/accounts/{id}/stream` subscriber, and the time for one committed transaction to
+reach every subscriber of its account.
+
+Subscribers consume `AccountService.stream` directly: `ASGITransport` buffers whole responses,
+so it cannot hold a stream open.
+
+    python -m benchmarks.bench_stream [subscribers]
+"""
+import asyncio
+import sys
+import tracemalloc
+
+from benchmarks.common import Timer, bench_client, create_account
+
+
+async def main(subscribers: int) -> None:
+    from src.pubsub import account_events
+    from src.schemas.transaction import TransactionIn
+    from src.services.account import AccountService
+    from src.services.transaction import TransactionService
+
+    async with bench_client():
+        account_id = await create_account(balance=1)
+        # Warm the read cache so the subscribers' snapshots are not one query each.
+        await AccountService().read(account_id)
+        received = 0
+        everyone = asyncio.Event()
+
+        async def follow() -> None:
+            nonlocal received
+            async for event in AccountService().stream(account_id):
+                if event.startswith(b"event: transaction"):
+                    received += 1
+                    if received == subscribers:
+                        everyone.set()
+
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        tasks = [asyncio.create_task(follow()) for _ in range(subscribers)]
+        while sum(map(len, account_events.subscribers.values())) < subscribers:
+            await asyncio.sleep(0.01)
+        per_subscriber = (tracemalloc.get_traced_memory()[0] - before) / subscribers
+        tracemalloc.stop()
+        print(f"{subscribers} idle subscribers: {per_subscriber / 1024:.1f} KiB each")
+
+        with Timer() as timer:
+            await TransactionService().create(TransactionIn(account_id=account_id, type="DEPOSIT", amount=1))
+            await everyone.wait()
+        print(f"commit + fan-out to {subscribers} subscribers: {timer.elapsed * 1000:.1f} ms")
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000))
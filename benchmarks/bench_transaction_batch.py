@@ -0,0 +1,32 @@
+"""
+Throughput of `POST /transactions/batch` against one `POST /transactions/` request per item.
+
+    python -m benchmarks.bench_transaction_batch [items]
+"""
+import asyncio
+import sys
+
+from benchmarks.common import Timer, bench_client, create_account, login_headers, report
+
+
+async def main(items: int) -> None:
+    async with bench_client() as client:
+        headers = await login_headers(client)
+        account_ids = [await create_account(balance=1_000_000) for _ in range(10)]
+        payload = [
+            {"account_id": account_ids[i % len(account_ids)], "type": "DEPOSIT" if i % 2 else "WITHDRAWAL", "amount": 1}
+            for i in range(items)
+        ]
+
+        with Timer() as timer:
+            for item in payload:
+                await client.post("/transactions/", json=item, headers=headers)
+        report("POST /transactions/ (per item)", items, timer.elapsed)
+
+        with Timer() as timer:
+            await client.post("/transactions/batch", json=payload, headers=headers)
+        report("POST /transactions/batch", items, timer.elapsed)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
@@ -0,0 +1,46 @@
+"""
+Page latency of `GET /transactions/{account_id}` at page 1 and at page 10,000.
+
+With keyset pagination both pages are an index range scan on (account_id, timestamp, id), so
+their latency should match. The equivalent LIMIT/OFFSET query is timed for comparison.
+
+    python -m benchmarks.bench_transaction_pagination [pages]
+"""
+import asyncio
+import sys
+
+from benchmarks.common import Timer, bench_client, create_account, login_headers, seed_transactions
+
+PAGE_SIZE = 10
+REPEAT = 200
+
+
+async def main(pages: int) -> None:
+    from src.database import database
+    from src.models.transaction import transactions
+    from src.services.transaction import encode_cursor
+
+    async with bench_client() as client:
+        headers = await login_headers(client)
+        account_id = await create_account()
+        seed_transactions(account_id, pages * PAGE_SIZE)
+
+        ordered = transactions.select().where(transactions.c.account_id == account_id).order_by(transactions.c.timestamp, transactions.c.id)
+        last_of_previous_page = await database.fetch_one(ordered.offset((pages - 1) * PAGE_SIZE - 1).limit(1))
+
+        for name, params in (("page 1", {}), (f"page {pages}", {"after": encode_cursor(last_of_previous_page)})):
+            with Timer() as timer:
+                for _ in range(REPEAT):
+                    response = await client.get(f"/transactions/{account_id}", params={"limit": PAGE_SIZE, **params}, headers=headers)
+            assert len(response.json()["items"]) == PAGE_SIZE
+            print(f"keyset {name:<12} {timer.elapsed / REPEAT * 1000:8.3f} ms/request")
+
+        for name, offset in (("page 1", 0), (f"page {pages}", (pages - 1) * PAGE_SIZE)):
+            with Timer() as timer:
+                for _ in range(REPEAT):
+                    await database.fetch_all(ordered.limit(PAGE_SIZE).offset(offset))
+            print(f"offset {name:<12} {timer.elapsed / REPEAT * 1000:8.3f} ms/query")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000))
@@ -0,0 +1,118 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks drive the real `src.main.app` in-process through httpx's `ASGITransport`, against a
+throwaway SQLite database. Importing this module sets default environment variables, so it must be
+imported before anything from `src`.
+"""
+import os
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+_workdir = tempfile.mkdtemp(prefix="bank-bench-")
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_workdir}/bench.db")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("SECRET", "benchmark-secret-benchmark-secret-key")
+# Throughput scenarios log in far faster than any real client; bench_login_flood turns it back on.
+os.environ.setdefault("LOGIN_ADMISSION_CONTROL", "false")
+
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+
+
+@asynccontextmanager
+async def bench_client():
+    from src.database import database, engine, metadata
+    from src.main import app
+    from src.models.account import accounts  # noqa
+    from src.models.idempotency import idempotency_keys  # noqa
+    from src.models.revoked_token import revoked_tokens  # noqa
+    from src.models.transaction import transactions  # noqa
+    from src.models.user import users  # noqa
+
+    metadata.create_all(engine)
+    await database.connect()
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(base_url="http://bench", transport=transport) as client:
+            yield client
+    finally:
+        await database.disconnect()
+        metadata.drop_all(engine)
+
+
+@asynccontextmanager
+async def remote_client(url: str):
+    """
+    Client for a server that is already running, e.g. `uvicorn src.main:app`.
+
+    The server must use the same DATABASE_URL as the benchmark, which seeds its data directly.
+    Tables are created if missing and never dropped.
+    """
+    from src.database import database, engine, metadata
+    from src.models.account import accounts  # noqa
+    from src.models.idempotency import idempotency_keys  # noqa
+    from src.models.revoked_token import revoked_tokens  # noqa
+    from src.models.transaction import transactions  # noqa
+    from src.models.user import users  # noqa
+
+    metadata.create_all(engine)
+    await database.connect()
+    try:
+        async with AsyncClient(base_url=url) as client:
+            yield client
+    finally:
+        await database.disconnect()
+
+
+async def login_headers(client: AsyncClient, cpf: str = "99999999999", role: str = "MANAGER") -> dict[str, str]:
+    from src.database import database
+    from src.models.user import users
+    from src.security.auth import hash_password
+
+    # A server benchmarked with `remote_client` keeps its database between runs.
+    if not await database.fetch_one(users.select().where(users.c.cpf == cpf)):
+        await database.execute(users.insert().values(name="Benchmark", cpf=cpf, password=hash_password("bench1234"), role_id=role))
+    response = await client.post("/auth/login", json={"cpf": cpf, "password": "bench1234"})
+
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def create_account(balance: float = 0, user_id: int = 1) -> int:
+    from src.database import database
+    from src.models.account import accounts
+
+    return await database.execute(accounts.insert().values(user_id=user_id, balance=balance))
+
+
+def seed_transactions(account_id: int, rows: int) -> None:
+    """Inserts `rows` one-second-apart deposits for `account_id` in a single statement."""
+    from src.database import engine
+    from src.models.transaction import transactions
+
+    start = datetime(2024, 1, 1)
+    with engine.begin() as connection:
+        connection.execute(
+            transactions.insert(),
+            [{"account_id": account_id, "type": "DEPOSIT", "amount": 1, "timestamp": start + timedelta(seconds=i)} for i in range(rows)],
+        )
+
+
+class Timer:
+    def __enter__(self) -> "Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.elapsed = time.perf_counter() - self.start
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+    return {f"p{p}": ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] for p in (50, 95, 99)}
+
+
+def report(name: str, operations: int, elapsed: float) -> None:
+    print(f"{name:<40} {operations:>8} ops  {elapsed:8.3f} s  {operations / elapsed:10.1f} ops/s")
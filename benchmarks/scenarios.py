@@ -0,0 +1,99 @@
+"""
+Load-test scenarios run by `python -m benchmarks`.
+
+A scenario seeds what it needs and returns a `send(client, i)` coroutine function that issues
+the i-th request. The runner calls it from `concurrency` workers and times every call.
+"""
+from typing import Awaitable, Callable, NamedTuple
+
+from httpx import AsyncClient, Response
+
+from benchmarks.common import create_account, seed_transactions
+
+Send = Callable[[AsyncClient, int], Awaitable[Response]]
+Setup = Callable[[AsyncClient, dict[str, str]], Awaitable[Send]]
+
+
+class Scenario(NamedTuple):
+    setup: Setup
+    requests: int
+
+
+SCENARIOS: dict[str, Scenario] = {}
+
+COLD_ACCOUNTS = 1000
+PAGINATION_ROWS = 100_000
+PAGE_SIZE = 50
+
+
+def scenario(name: str, requests: int = 2000) -> Callable[[Setup], Setup]:
+    """Registers a scenario; `requests` is its default request count."""
+    def register(setup: Setup) -> Setup:
+        SCENARIOS[name] = Scenario(setup, requests)
+        return setup
+    return register
+
+
+@scenario("login", requests=200)
+async def login(client: AsyncClient, headers: dict[str, str]) -> Send:
+    credentials = {"cpf": "99999999999", "password": "bench1234"}
+
+    async def send(client: AsyncClient, i: int) -> Response:
+        return await client.post("/auth/login", json=credentials)
+    return send
+
+
+@scenario("users_me")
+async def users_me(client: AsyncClient, headers: dict[str, str]) -> Send:
+    async def send(client: AsyncClient, i: int) -> Response:
+        return await client.get("/users/me", headers=headers)
+    return send
+
+
+@scenario("transaction_hot")
+async def transaction_hot(client: AsyncClient, headers: dict[str, str]) -> Send:
+    """
+    Every deposit hits the same account, so writers contend for one row.
+
+    Compare with TRANSACTION_COALESCING=true to measure group commit on a hot account.
+    """
+    account_id = await create_account(balance=0)
+
+    async def send(client: AsyncClient, i: int) -> Response:
+        return await client.post("/transactions/", json={"account_id": account_id, "type": "DEPOSIT", "amount": 1}, headers=headers)
+    return send
+
+
+@scenario("transaction_cold")
+async def transaction_cold(client: AsyncClient, headers: dict[str, str]) -> Send:
+    """Deposits are spread round-robin over many accounts."""
+    account_ids = [await create_account(balance=0) for _ in range(COLD_ACCOUNTS)]
+
+    async def send(client: AsyncClient, i: int) -> Response:
+        account_id = account_ids[i % len(account_ids)]
+        return await client.post("/transactions/", json={"account_id": account_id, "type": "DEPOSIT", "amount": 1}, headers=headers)
+    return send
+
+
+@scenario("deep_pagination")
+async def deep_pagination(client: AsyncClient, headers: dict[str, str]) -> Send:
+    """Pages near the end of a long statement, reached through a keyset cursor."""
+    from src.database import database
+    from src.models.transaction import transactions
+    from src.services.transaction import encode_cursor
+
+    account_id = await create_account(balance=0)
+    seed_transactions(account_id, PAGINATION_ROWS)
+
+    query = (
+        transactions.select()
+        .where(transactions.c.account_id == account_id)
+        .order_by(transactions.c.timestamp, transactions.c.id)
+        .offset(PAGINATION_ROWS - 2 * PAGE_SIZE)
+        .limit(1)
+    )
+    params = {"limit": PAGE_SIZE, "after": encode_cursor(await database.fetch_one(query))}
+
+    async def send(client: AsyncClient, i: int) -> Response:
+        return await client.get(f"/transactions/{account_id}", params=params, headers=headers)
+    return send
@@ -2,8 +2,6 @@ from logging.config import fileConfig
 
 from alembic import context
 
-from src.config import settings
-
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
@@ -15,6 +13,8 @@ if config.config_file_name is not None:
 
 from src.database import engine, metadata
 from src.models.account import accounts
+from src.models.idempotency import idempotency_keys
+from src.models.revoked_token import revoked_tokens
 from src.models.transaction import transactions
 from src.models.user import users
 
@@ -42,7 +42,7 @@ def run_migrations_offline() -> None:
     script output.
 
     """
-    url = settings.database_url
+    url = engine.url.render_as_string(hide_password=False)
     context.configure(
         url=url,
         target_metadata=target_metadata,
@@ -0,0 +1,40 @@
+"""add transfer transaction types
+
+Revision ID: 60fd36d732ca
+Revises: c32bcd0ff6f4
+Create Date: 2026-10-18 09:12:41.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '60fd36d732ca'
+down_revision: Union[str, None] = 'c32bcd0ff6f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+old_type = sa.Enum('DEPOSIT', 'WITHDRAWAL', name='transaction_types')
+new_type = sa.Enum('DEPOSIT', 'WITHDRAWAL', 'TRANSFER_IN', 'TRANSFER_OUT', name='transaction_types')
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name == 'postgresql':
+        # ALTER TYPE ... ADD VALUE cannot run inside a transaction block.
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE transaction_types ADD VALUE IF NOT EXISTS 'TRANSFER_IN'")
+            op.execute("ALTER TYPE transaction_types ADD VALUE IF NOT EXISTS 'TRANSFER_OUT'")
+    else:
+        with op.batch_alter_table('transactions') as batch_op:
+            batch_op.alter_column('type', existing_type=old_type, type_=new_type, existing_nullable=False)
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM transactions WHERE type IN ('TRANSFER_IN', 'TRANSFER_OUT')")
+    if op.get_context().dialect.name != 'postgresql':
+        # Postgres cannot drop values from an enum type; the unused labels are left in place.
+        with op.batch_alter_table('transactions') as batch_op:
+            batch_op.alter_column('type', existing_type=new_type, type_=old_type, existing_nullable=False)
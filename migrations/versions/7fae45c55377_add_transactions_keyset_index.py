@@ -0,0 +1,26 @@
+"""add transactions keyset index
+
+Revision ID: 7fae45c55377
+Revises: 60fd36d732ca
+Create Date: 2026-10-18 10:03:17.224906
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7fae45c55377'
+down_revision: Union[str, None] = '60fd36d732ca'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_transactions_account_id_timestamp_id', 'transactions', ['account_id', 'timestamp', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transactions_account_id_timestamp_id', table_name='transactions')
@@ -0,0 +1,26 @@
+"""add accounts version
+
+Revision ID: b41c7e9d2a6f
+Revises: 5932501c5188
+Create Date: 2026-10-18 16:02:37.418205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b41c7e9d2a6f'
+down_revision: Union[str, None] = '5932501c5188'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('accounts', sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('accounts', 'version')
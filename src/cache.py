@@ -0,0 +1,146 @@
+"""
+Read-through caching of single rows for the most polled endpoints.
+
+`ReadThroughCache` keeps the hit/miss accounting and the consistency rules; where the entries
+live is up to its `CacheBackend`. `MemoryBackend` keeps them in this process, which is only
+coherent with a single worker: with several, each one is invalidated by its own writes only and
+may serve another worker's stale entry until it expires. A shared store implementing
+`CacheBackend` removes that limit; entries are plain dicts so they can be serialized.
+"""
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+from src.metrics import GaugeCallback, registry
+
+
+class CacheBackend(ABC):
+    """Storage for `ReadThroughCache`; `get` returns None for a missing or expired key."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Any | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None: ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    async def clear(self) -> None: ...
+
+
+class MemoryBackend(CacheBackend):
+    """Bounded in-process LRU; entries also expire after their TTL."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.evictions = 0
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        if self.maxsize <= 0:
+            return
+
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+
+class ReadThroughCache:
+    """
+    Serves rows from `backend`, loading and storing them on a miss.
+
+    Writers call `invalidate` once their change is committed, through `writer.after_commit` so that
+    it waits for any enclosing transaction. A load that was already running when its key was
+    invalidated may have read the old row, so its result is returned to its caller but not stored;
+    after `invalidate` returns, no reader can be served the old row.
+    """
+
+    def __init__(self, name: str, backend: CacheBackend, ttl: float):
+        self.name = name
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._loading: dict[str, int] = {}
+        self._invalidated: set[str] = set()
+        caches[name] = self
+
+    async def get(self, key: Any, load: Callable[[], Awaitable[Any]]) -> Any:
+        key = f"{self.name}:{key}"
+        value = await self.backend.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        self._loading[key] = self._loading.get(key, 0) + 1
+        try:
+            value = await load()
+            if value is not None and key not in self._invalidated:
+                await self.backend.set(key, value, self.ttl)
+        finally:
+            self._loading[key] -= 1
+            if not self._loading[key]:
+                del self._loading[key]
+                self._invalidated.discard(key)
+        return value
+
+    async def invalidate(self, *keys: Any) -> None:
+        for key in keys:
+            key = f"{self.name}:{key}"
+            if key in self._loading:
+                self._invalidated.add(key)
+            await self.backend.delete(key)
+
+    async def clear(self) -> None:
+        await self.backend.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+caches: dict[str, ReadThroughCache] = {}
+
+registry.register(GaugeCallback(
+    "read_cache_hits_total", "Reads served from a read-through cache.",
+    lambda: {(name,): cache.hits for name, cache in caches.items()}, labelnames=("cache",), type="counter",
+))
+registry.register(GaugeCallback(
+    "read_cache_misses_total", "Reads that went to the database.",
+    lambda: {(name,): cache.misses for name, cache in caches.items()}, labelnames=("cache",), type="counter",
+))
+registry.register(GaugeCallback(
+    "read_cache_evictions_total", "Entries evicted to make room in an in-process cache.",
+    lambda: {(name,): cache.backend.evictions for name, cache in caches.items() if isinstance(cache.backend, MemoryBackend)},
+    labelnames=("cache",), type="counter",
+))
+registry.register(GaugeCallback(
+    "read_cache_size", "Entries held by an in-process cache.",
+    lambda: {(name,): len(cache.backend) for name, cache in caches.items() if isinstance(cache.backend, MemoryBackend)},
+    labelnames=("cache",),
+))
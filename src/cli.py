@@ -0,0 +1,62 @@
+"""
+Administrative commands that run against the database directly.
+
+    python -m src.cli import-users partners.csv
+    python -m src.cli import-users partners.ndjson --format ndjson > rejected.ndjson
+
+`import-users` writes one NDJSON line per rejected row to stdout and its progress to stderr, and
+exits with status 1 if any row was rejected.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+from src.database import database
+from src.schemas.user import ImportFormat, Role
+from src.services.user import UserService
+
+# Whoever can run this already has the database credentials.
+CLI_USER = {"user_id": "cli", "role": Role.MANAGER}
+
+
+async def read_chunks(path: Path, size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    with path.open("rb") as file:
+        while chunk := file.read(size):
+            yield chunk
+
+
+async def import_users(args: argparse.Namespace) -> int:
+    format = args.format or ImportFormat(args.path.suffix.lstrip(".").lower())
+    progress = {"processed": 0, "created": 0, "rejected": 0}
+
+    await database.connect()
+    try:
+        async for event in UserService().import_users(read_chunks(args.path), format, CLI_USER):
+            if "progress" in event:
+                progress = event["progress"]
+                print("processed {processed}, created {created}, rejected {rejected}".format(**progress), file=sys.stderr)
+            else:
+                print(json.dumps(event))
+    finally:
+        await database.disconnect()
+
+    return 1 if progress["rejected"] else 0
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="Bank API administration.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("import-users", help="create clients in bulk from CSV or NDJSON")
+    command.add_argument("path", type=Path, help="name,cpf,password CSV or NDJSON of users")
+    command.add_argument("--format", type=ImportFormat, help="csv or ndjson (default: from the file extension)")
+    command.set_defaults(run=import_users)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    sys.exit(asyncio.run(args.run(args)))
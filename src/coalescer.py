@@ -0,0 +1,107 @@
+"""
+Group commit for writes that contend on the same row.
+
+Every deposit to a busy merchant account updates the same balance row, so concurrent requests
+queue up on its row lock one commit at a time. With coalescing on, requests for the same key are
+held for up to `window` seconds (or until `batch_size` of them are pending) and handed to a single
+`flush` call, which applies them together and returns one outcome per item.
+"""
+import asyncio
+import contextvars
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+from src.metrics import Histogram, registry
+
+T = TypeVar("T")
+Item = TypeVar("Item")
+Flush = Callable[[list[Item]], Awaitable[list[T | Exception]]]
+
+coalesced_batch_size = registry.register(
+    Histogram("coalesced_batch_size", "Items applied together by one coalesced flush.", buckets=(1, 2, 5, 10, 25, 50, 100, 250))
+)
+
+
+class _Group:
+    __slots__ = ("items", "futures", "full", "task")
+
+    def __init__(self):
+        self.items: list[Any] = []
+        self.futures: list[asyncio.Future] = []
+        self.full = asyncio.Event()
+        self.task: asyncio.Task | None = None
+
+
+class Coalescer:
+    def __init__(self, enabled: bool, window: float, batch_size: int):
+        self.enabled = enabled
+        self.window = window
+        self.batch_size = batch_size
+        self._groups: dict[Hashable, _Group] = {}
+
+    async def run(self, key: Hashable, item: Item, flush: Flush) -> T:
+        """
+        Queues `item` behind `key` and waits for the flush that applies it.
+
+        Args:
+            key (Hashable): Items with the same key are flushed together, in arrival order.
+            item (Item): What to apply.
+            flush (Flush): Applies a list of items and returns, in the same order, each one's
+                result or the exception to raise to its caller. The first caller's `flush` is
+                used for the whole group.
+
+        Returns:
+            T: This item's result.
+
+        Raises:
+            Exception: This item's exception, or whatever `flush` itself raised.
+        """
+        loop = asyncio.get_running_loop()
+        group = self._groups.get(key)
+        if group is not None and group.task.get_loop() is not loop:
+            # Left behind by an event loop that was closed before the flush, e.g. between tests.
+            group = None
+        if group is None:
+            group = self._groups[key] = _Group()
+            # Like the writer, the flush gets an empty context rather than the first caller's.
+            group.task = asyncio.create_task(self.__flush(key, group, flush), context=contextvars.Context())
+
+        future = loop.create_future()
+        group.items.append(item)
+        group.futures.append(future)
+        if len(group.items) >= self.batch_size:
+            # Close the group: later items for the key start the next one.
+            del self._groups[key]
+            group.full.set()
+        return await future
+
+    async def __flush(self, key: Hashable, group: _Group, flush: Flush) -> None:
+        try:
+            await asyncio.wait_for(group.full.wait(), self.window)
+        except TimeoutError:
+            pass
+        if self._groups.get(key) is group:
+            del self._groups[key]
+
+        # Callers that went away before the flush are left out.
+        pending = [(item, future) for item, future in zip(group.items, group.futures) if not future.done()]
+        if not pending:
+            return
+        coalesced_batch_size.observe(len(pending))
+
+        try:
+            outcomes = await flush([item for item, _ in pending])
+        except Exception as error:
+            outcomes = [error] * len(pending)
+        except BaseException:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(RuntimeError("Coalesced flush was cancelled"))
+            raise
+
+        for (_, future), outcome in zip(pending, outcomes):
+            if future.done():
+                continue
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
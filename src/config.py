@@ -5,10 +5,59 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", extra="ignore", env_file_encoding="utf-8")
 
     database_url: str
+    database_pool_min_size: int = 1
+    database_pool_max_size: int = 20
+    database_pool_acquire_timeout_seconds: float = 10
+    database_statement_cache_size: int = 100
+
+    sqlite_journal_mode: str = "wal"
+    sqlite_synchronous: str = "normal"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_single_writer: bool = True
+    sqlite_writer_batch_size: int = 100
     environment: str = "production"
 
     algorithm: str 
     secret: str
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 4
+    # 0 uses one process per core.
+    password_import_processes: int = 0
+    token_cache_size: int = 10_000
+    access_token_ttl_seconds: int = 15 * 60
+    refresh_token_ttl_seconds: int = 7 * 24 * 60 * 60
+    token_revocation_sync_seconds: float = 5
+
+    login_admission_control: bool = True
+    login_ip_rate_per_minute: float = 60
+    login_ip_burst: int = 20
+    login_cpf_rate_per_minute: float = 10
+    login_cpf_burst: int = 5
+    login_rate_limit_keys: int = 100_000
+    login_max_concurrent_verifications: int = 8
+
+    read_cache_size: int = 10_000
+    read_cache_ttl_seconds: float = 30
+
+    slow_query_threshold_ms: float = 200
+
+    transaction_batch_chunk_size: int = 500
+    user_import_chunk_size: int = 1000
+    account_bulk_chunk_size: int = 1000
+    transaction_coalescing: bool = False
+    transaction_coalescing_window_ms: float = 5
+    transaction_coalescing_batch_size: int = 100
+    account_lock_stripes: int = 1024
+    export_chunk_size: int = 1000
+
+    stream_queue_size: int = 100
+    stream_heartbeat_seconds: float = 15
+
+    idempotency_key_ttl_seconds: int = 24 * 60 * 60
+    idempotency_cache_size: int = 10_000
+    idempotency_purge_interval_seconds: int = 5 * 60
+    idempotency_purge_batch_size: int = 1000
 
 
 settings = Settings()
\ No newline at end of file
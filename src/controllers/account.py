@@ -1,14 +1,21 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Body, Depends, Header, Query, Response, status, HTTPException
+from fastapi.responses import StreamingResponse
 
+from src.etag import account_etag, etag_matches
 from src.schemas.account import AccountIn
-from src.security.auth import login_required
+from src.security.auth import JWTBearer, JWTToken, login_required
 from src.services.account import AccountService
-from src.views.account import AccountOut, AccountCreatedOut
-from src.exceptions import UserNotFoundError, AccountNotFoundError
+from src.services.transaction import TransactionService
+from src.views.account import AccountOut, AccountCreatedOut, account_list_json
+from src.exceptions import UserNotFoundError, AccountNotFoundError, ForbiddenAccountAccess
 
 router = APIRouter(prefix="/accounts", dependencies=[Depends(login_required)])
 
 service = AccountService()
+transaction_service = TransactionService()
+
+MAX_BULK_ACCOUNTS = 10_000
+MAX_IDS = 1000
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=AccountCreatedOut)
@@ -22,15 +29,51 @@ async def create_account(account: AccountIn):
         )
 
 
+@router.post("/bulk", status_code=status.HTTP_201_CREATED, response_model=list[AccountCreatedOut])
+async def create_accounts(accounts: list[AccountIn] = Body(..., min_length=1, max_length=MAX_BULK_ACCOUNTS)):
+    try:
+        return await service.create_many(accounts)
+    except UserNotFoundError as error:
+        missing = ", ".join(map(str, error.args[0]))
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"User not found: {missing}"
+        )
+
+
 @router.get("/", response_model=list[AccountOut])
-async def list_accounts(limit: int, skip: int = 0):
-    return await service.read_all(limit=limit, skip=skip)
+async def list_accounts(
+    limit: int | None = None,
+    skip: int = 0,
+    ids: str | None = Query(None, description="Comma-separated account ids, returned in this order; limit and skip are ignored."),
+):
+    if ids is not None:
+        try:
+            account_ids = [int(id) for id in ids.split(",")]
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="ids must be a comma-separated list of integers"
+            )
+        if len(account_ids) > MAX_IDS:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"At most {MAX_IDS} ids per request"
+            )
+        return Response(account_list_json(await service.read_many(account_ids)), media_type="application/json")
+
+    if limit is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Either limit or ids is required"
+        )
+    return Response(account_list_json(await service.read_all(limit=limit, skip=skip)), media_type="application/json")
 
 
 @router.get("/users/{user_id}", response_model=list[AccountOut])
 async def list_accounts_by_user(user_id: int):
     try:
-        return await service.read_by_user_id(user_id)
+        return Response(account_list_json(await service.read_by_user_id(user_id)), media_type="application/json")
     except UserNotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -43,16 +86,46 @@ async def read_my_info(current_user: dict[str, str] = Depends(login_required)):
     return await service.read(int(current_user["user_id"]))
 
 
-@router.get("/{id}", response_model=AccountOut)
-async def read_account(id: int):
+@router.get("/{id}", response_model=AccountOut, responses={304: {"description": "Not Modified"}})
+async def read_account(id: int, response: Response, if_none_match: str | None = Header(None)):
     try:
-        return await service.read(id)
+        account = await service.read(id)
     except AccountNotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Account not found"
         )
 
+    etag = account_etag(account)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+    return account
+
+
+@router.get("/{id}/stream", response_class=StreamingResponse)
+async def stream_account(id: int, current_user = Depends(login_required), token: JWTToken = Depends(JWTBearer())):
+    try:
+        await transaction_service.check_account_access(account_id=id, current_user=current_user)
+    except AccountNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Account not found"
+        )
+    except ForbiddenAccountAccess:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to access this account."
+        )
+
+    return StreamingResponse(
+        service.stream(id, token.access_token),
+        media_type="text/event-stream",
+        # Tells reverse proxies not to buffer the events.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT, response_model=None)
 async def delete_account(id: int):
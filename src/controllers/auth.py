@@ -1,10 +1,12 @@
-from fastapi import APIRouter, HTTPException, status
+import math
 
-from src.security.auth import sign_jwt
-from src.schemas.auth import LoginIn
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+
+from src.security.auth import JWTBearer, JWTToken, sign_jwt, sign_refresh_jwt
+from src.schemas.auth import LoginIn, LogoutIn, RefreshIn
 from src.views.auth import LoginOut
 from src.services.auth import AuthService
-from src.exceptions import IncorrectUserInformationError
+from src.exceptions import IncorrectUserInformationError, InvalidTokenError, RateLimitedError
 
 
 router = APIRouter(prefix="/auth")
@@ -12,13 +14,37 @@ router = APIRouter(prefix="/auth")
 service = AuthService()
 
 
-@router.post("/login", response_model=LoginOut)
-async def login(data: LoginIn):
+@router.post("/login", response_model=LoginOut, responses={429: {"description": "Too Many Requests"}})
+async def login(data: LoginIn, request: Request):
     try:
-        user = await service.login(data.cpf, data.password)
-        return sign_jwt(user_id=str(user.id), role=user.role_id)
+        user = await service.login(data.cpf, data.password, request.client.host if request.client else "")
+        return {**sign_jwt(user_id=str(user.id), role=user.role_id), "refresh_token": sign_refresh_jwt(user_id=str(user.id), role=user.role_id)}
     except IncorrectUserInformationError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect user information"
-        )
\ No newline at end of file
+        )
+    except RateLimitedError as error:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts",
+            headers={"Retry-After": str(math.ceil(error.args[0]))},
+        )
+
+
+@router.post("/refresh", response_model=LoginOut)
+async def refresh(data: RefreshIn):
+    try:
+        claims = await service.refresh(data.refresh_token)
+    except InvalidTokenError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token"
+        )
+
+    return {**sign_jwt(user_id=claims.sub, role=claims.rol), "refresh_token": sign_refresh_jwt(user_id=claims.sub, role=claims.rol)}
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT, response_model=None)
+async def logout(data: LogoutIn | None = None, token: JWTToken = Depends(JWTBearer())):
+    await service.logout(token.access_token, data.refresh_token if data else None)
\ No newline at end of file
@@ -1,21 +1,55 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+import hashlib
 
-from src.schemas.transaction import TransactionIn
+from fastapi import APIRouter, Body, Depends, Header, Query, Response, status, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+from src.etag import account_etag, etag_matches
+from src.schemas.transaction import ExportFormat, TransactionIn, TransferIn
 from src.security.auth import login_required
+from src.services.idempotency import IdempotencyService
 from src.services.transaction import TransactionService
-from src.views.transaction import TransactionCreatedOut, TransactionOut
-from src.exceptions import AccountNotFoundError, BusinessError, ForbiddenAccountAccess
+from src.views.transaction import TransactionBatchItemOut, TransactionCreatedOut, TransactionPageOut, TransferOut, transaction_page_json
+from src.exceptions import AccountNotFoundError, BusinessError, ForbiddenAccountAccess, IdempotencyKeyReusedError, InvalidCursorError
 
 
 router = APIRouter(prefix="/transactions", dependencies=[Depends(login_required)])
 
 service = TransactionService()
+idempotency_service = IdempotencyService()
+
+MAX_BATCH_TRANSACTIONS = 10_000
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=TransactionCreatedOut)
-async def create_transaction(transaction: TransactionIn):
+async def create_transaction(
+    transaction: TransactionIn,
+    response: Response,
+    idempotency_key: str | None = Header(None, max_length=255),
+    current_user = Depends(login_required),
+):
+    async def operation():
+        return jsonable_encoder(dict(await service.create(transaction)))
+
     try:
-        return await service.create(transaction)
+        if not idempotency_key:
+            return await service.create(transaction)
+
+        # Keys are scoped to the caller so one client cannot replay another client's response, and
+        # stored as a digest so the scoped key always fits the column whatever the header's length.
+        result, replayed = await idempotency_service.run(
+            key=hashlib.sha256(f"{current_user['user_id']}:{idempotency_key}".encode()).hexdigest(),
+            request_hash=hashlib.sha256(transaction.model_dump_json().encode()).hexdigest(),
+            operation=operation,
+        )
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+        return result
+    except IdempotencyKeyReusedError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used with a different request"
+        )
     except AccountNotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, 
@@ -28,10 +62,66 @@ async def create_transaction(transaction: TransactionIn):
         )
     
 
-@router.get("/{account_id}", response_model=list[TransactionOut])
-async def list_transactions(account_id: int, limit: int = 10, skip: int = 0, current_user = Depends(login_required)):
+@router.post("/transfer", status_code=status.HTTP_201_CREATED, response_model=TransferOut)
+async def create_transfer(transfer: TransferIn):
     try:
-        return await service.read_all_by_account_id(account_id=account_id, current_user=current_user, limit=limit, skip=skip)
+        return await service.transfer(transfer)
+    except AccountNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Account not found"
+        )
+    except BusinessError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Operation not carried out due to lack of balance"
+        )
+
+
+@router.post("/batch", response_model=list[TransactionBatchItemOut])
+async def create_transaction_batch(transactions: list[TransactionIn] = Body(..., max_length=MAX_BATCH_TRANSACTIONS)):
+    return await service.create_batch(transactions)
+
+
+@router.get("/{account_id}", response_model=TransactionPageOut, responses={304: {"description": "Not Modified"}})
+async def list_transactions(
+    account_id: int,
+    limit: int = Query(10, gt=0, le=1000),
+    after: str | None = None,
+    if_none_match: str | None = Header(None),
+    current_user = Depends(login_required),
+):
+    try:
+        # The access check reads the account version, so an unchanged page costs one indexed lookup.
+        account = await service.check_account_access(account_id=account_id, current_user=current_user)
+        etag = account_etag(account)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        page = await service.read_page(account_id=account_id, limit=limit, after=after)
+    except AccountNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Account not found"
+        )
+    except ForbiddenAccountAccess:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to access this account."
+        )
+    except InvalidCursorError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+    return Response(transaction_page_json(page["items"], page["next_cursor"]), media_type="application/json", headers={"ETag": etag})
+
+
+@router.get("/{account_id}/export", response_class=StreamingResponse)
+async def export_transactions(account_id: int, format: ExportFormat = ExportFormat.CSV, current_user = Depends(login_required)):
+    try:
+        await service.check_account_access(account_id=account_id, current_user=current_user)
     except AccountNotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -42,3 +132,10 @@ async def list_transactions(account_id: int, limit: int = 10, skip: int = 0, cur
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You do not have permission to access this account."
         )
+
+    media_type = "text/csv" if format == ExportFormat.CSV else "application/x-ndjson"
+    return StreamingResponse(
+        service.export_by_account_id(account_id, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="statement-{account_id}.{format.value}"'},
+    )
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+import json
 
-from src.schemas.user import UserIn, UserUpdateIn, UserRoleUpdateIn
+import anyio
+from fastapi import APIRouter, Depends, Request, Response, status, HTTPException
+from fastapi.responses import StreamingResponse
+
+from src.schemas.user import ImportFormat, UserIn, UserUpdateIn, UserRoleUpdateIn
 from src.security.auth import login_required
 from src.services.user import UserService
-from src.views.user import UserCreatedOut, UserOut
+from src.views.user import UserCreatedOut, UserOut, user_list_json
 from src.exceptions import UserNotFoundError, ForbiddenAccountAccess
 
 router = APIRouter(prefix="/users")
@@ -11,21 +15,53 @@ router = APIRouter(prefix="/users")
 service = UserService()
 
 
+class RequestBodyStreamingResponse(StreamingResponse):
+    """
+    Streams a response that is computed while the request body is still being read.
+
+    StreamingResponse watches for the client going away by reading `receive` itself, which would
+    take the body chunks away from the content; reading the body raises ClientDisconnect instead.
+    """
+
+    async def listen_for_disconnect(self, receive) -> None:
+        await anyio.sleep_forever()
+
+
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=UserCreatedOut)
 async def create_user(user: UserIn):
     return {**user.model_dump(), "id": await service.create(user)}
 
 
+@router.post("/import", response_class=RequestBodyStreamingResponse)
+async def import_users(request: Request, format: ImportFormat = ImportFormat.CSV, current_user: dict[str, str] = Depends(login_required)):
+    """Streams NDJSON: one line per rejected row and a `progress` line after each chunk."""
+    try:
+        events = service.import_users(request.stream(), format, current_user)
+    except ForbiddenAccountAccess:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to access this resource."
+        )
+
+    async def stream():
+        async for event in events:
+            yield json.dumps(event) + "\n"
+
+    return RequestBodyStreamingResponse(stream(), media_type="application/x-ndjson")
+
+
 @router.get("/", response_model=list[UserOut])
 async def list_user(limit: int = 10, skip: int = 0, current_user: dict[str, str] = Depends(login_required)):
     try:
-        return await service.read_all(limit=limit, skip=skip, current_user=current_user)
+        records = await service.read_all(limit=limit, skip=skip, current_user=current_user)
     except ForbiddenAccountAccess:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You do not have permission to access this resource."
         )
 
+    return Response(user_list_json(records), media_type="application/json")
+
 
 @router.get("/me", response_model=UserOut)
 async def read_my_info(current_user: dict[str, str] = Depends(login_required)):
@@ -68,6 +104,11 @@ async def update_user(id: int, user: UserUpdateIn, current_user: dict[str, str]
 async def update_user_role(id: int, user: UserRoleUpdateIn, current_user: dict[str, str] = Depends(login_required)):
     try:
         return await service.update(id=id, user=user, current_user=current_user)
+    except UserNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
     except ForbiddenAccountAccess:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -1,12 +1,324 @@
+import asyncio
+import logging
+import operator
+import time
+from contextvars import ContextVar
+from typing import Iterable, Iterator
+
 import databases
 import sqlalchemy as sa
+from databases.interfaces import Record
+from sqlalchemy.sql import ClauseElement
 
 from src.config import settings
+from src.exceptions import DatabasePoolTimeoutError
+from src.metrics import Counter, GaugeCallback, Histogram, registry
+
+logger = logging.getLogger(__name__)
+
+db_statement_duration_seconds = registry.register(
+    Histogram("db_statement_duration_seconds", "Database statement latency.", ("operation",))
+)
+db_statement_rows = registry.register(
+    Histogram("db_statement_rows", "Rows returned per database statement.", ("operation",), buckets=(0, 1, 10, 100, 1000, 10000))
+)
+
+db_pool_acquire_seconds = registry.register(
+    Histogram("db_pool_acquire_seconds", "Time spent waiting for a database connection.")
+)
+db_pool_acquire_timeouts_total = registry.register(
+    Counter("db_pool_acquire_timeouts_total", "Connection requests that gave up after the acquire timeout.")
+)
+
+
+class ConnectionLimiter:
+    """
+    Caps the connections checked out at once and times how long callers wait for one.
+
+    asyncpg has a pool of its own but `databases` acquires from it without a timeout, and the
+    SQLite backend opens a new connection per acquire without any limit, so the cap is enforced
+    here for both. The semaphore is created on `reset()`, from the event loop that connects.
+    """
+
+    def __init__(self, max_size: int, timeout: float):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.in_use = 0
+        self.waiters = 0
+        self._semaphore: asyncio.Semaphore | None = None
+
+    def reset(self) -> None:
+        self._semaphore = asyncio.Semaphore(self.max_size)
+        self.in_use = 0
+        self.waiters = 0
+
+    async def acquire(self) -> None:
+        start = time.perf_counter()
+        if self._semaphore.locked():
+            self.waiters += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+            except TimeoutError:
+                db_pool_acquire_timeouts_total.inc()
+                raise DatabasePoolTimeoutError from None
+            finally:
+                self.waiters -= 1
+        else:
+            await self._semaphore.acquire()
+        self.in_use += 1
+        db_pool_acquire_seconds.observe(time.perf_counter() - start)
+
+    def release(self) -> None:
+        self.in_use -= 1
+        self._semaphore.release()
+
+
+class _LimitedConnectionBackend:
+    """
+    Backend connection that holds a `ConnectionLimiter` slot while acquired.
+
+    `init_script` runs on every freshly acquired SQLite connection.
+    """
+
+    def __init__(self, connection, limiter: ConnectionLimiter, init_script: str | None):
+        self._connection = connection
+        self._limiter = limiter
+        self._init_script = init_script
+
+    async def acquire(self) -> None:
+        await self._limiter.acquire()
+        try:
+            await self._connection.acquire()
+        except BaseException:
+            self._limiter.release()
+            raise
+        if self._init_script:
+            try:
+                await self._connection.raw_connection.executescript(self._init_script)
+            except BaseException:
+                await self.release()
+                raise
+
+    async def release(self) -> None:
+        try:
+            await self._connection.release()
+        finally:
+            self._limiter.release()
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+class _LimitedBackend:
+    def __init__(self, backend, limiter: ConnectionLimiter, init_script: str | None):
+        self._backend = backend
+        self._limiter = limiter
+        self._init_script = init_script
+
+    def connection(self) -> _LimitedConnectionBackend:
+        return _LimitedConnectionBackend(self._backend.connection(), self._limiter, self._init_script)
+
+    def __getattr__(self, name):
+        return getattr(self._backend, name)
+
+
+class QueryStats:
+    """Statements issued while serving one request."""
+
+    __slots__ = ("count", "duration")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+
+query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+class InstrumentedDatabase(databases.Database):
+    """
+    `databases.Database` that times `fetch_one`, `fetch_all`, `fetch_val`, `execute`,
+    `execute_many` and `iterate`.
+
+    Every statement is recorded in the `db_statement_*` histograms and added to the current
+    request's `QueryStats`, and statements slower than `settings.slow_query_threshold_ms` are
+    logged with their compiled SQL. Bound values are left out of the log on purpose: they may
+    hold password hashes. `execute_many` counts as one statement with one row per value set;
+    `iterate` is recorded once the iteration ends and only times the waits for rows, not the
+    caller's work between them.
+
+    Connections are checked out through a `ConnectionLimiter`, and `init_script` (SQLite only)
+    runs on each one as it is opened.
+    """
 
-database = databases.Database(settings.database_url)
+    def __init__(self, url: str, *, pool_size: int, acquire_timeout: float, init_script: str | None = None, **options):
+        super().__init__(url, **options)
+        self.limiter = ConnectionLimiter(pool_size, acquire_timeout)
+        self._backend = _LimitedBackend(self._backend, self.limiter, init_script)
+
+    async def connect(self) -> None:
+        if not self.is_connected:
+            self.limiter.reset()
+        await super().connect()
+
+    async def fetch_all(self, query, values=None):
+        start = time.perf_counter()
+        records = await super().fetch_all(query, values)
+        self._record("fetch_all", query, time.perf_counter() - start, len(records))
+        return records
+
+    async def fetch_one(self, query, values=None):
+        start = time.perf_counter()
+        record = await super().fetch_one(query, values)
+        self._record("fetch_one", query, time.perf_counter() - start, 0 if record is None else 1)
+        return record
+
+    async def fetch_val(self, query, values=None, column=0):
+        start = time.perf_counter()
+        value = await super().fetch_val(query, values, column=column)
+        self._record("fetch_val", query, time.perf_counter() - start, 1)
+        return value
+
+    async def execute(self, query, values=None):
+        start = time.perf_counter()
+        result = await super().execute(query, values)
+        self._record("execute", query, time.perf_counter() - start, 0)
+        return result
+
+    async def execute_many(self, query, values):
+        start = time.perf_counter()
+        await super().execute_many(query, values)
+        self._record("execute_many", query, time.perf_counter() - start, len(values))
+
+    async def iterate(self, query, values=None):
+        records = super().iterate(query, values)
+        rows = 0
+        elapsed = 0.0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    record = await records.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    elapsed += time.perf_counter() - start
+                rows += 1
+                yield record
+        finally:
+            # Also closes the cursor and releases the connection when the caller stops early.
+            await records.aclose()
+            self._record("iterate", query, elapsed, rows)
+
+    def _record(self, operation: str, query, elapsed: float, rows: int) -> None:
+        labels = (operation,)
+        db_statement_duration_seconds.observe(elapsed, labels)
+        db_statement_rows.observe(rows, labels)
+
+        stats = query_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.duration += elapsed
+
+        if elapsed * 1000 >= settings.slow_query_threshold_ms:
+            logger.warning("Slow query (%.1f ms, %d rows): %s", elapsed * 1000, rows, self._compile(query))
+
+    def _compile(self, query) -> str:
+        if not isinstance(query, ClauseElement):
+            return str(query)
+        try:
+            return str(query.compile(dialect=self._backend._dialect))
+        except Exception:
+            return str(query)
+
+
+class QueryStatsMiddleware:
+    """
+    Pure ASGI middleware that tracks the statements issued by each request.
+
+    Outside production the count is returned in the `X-Query-Count` response header, so N+1
+    regressions show up in tests.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = query_stats.set(stats)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and settings.environment != "production":
+                message.setdefault("headers", [])
+                message["headers"] = [*message["headers"], (b"x-query-count", str(stats.count).encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            query_stats.reset(token)
+
+
+def row_values(records: Iterable[Record], *columns: str) -> Iterator[tuple]:
+    """
+    Yields the values of `columns` from each record, in that order.
+
+    Reading the underlying row with one `itemgetter` skips the per-attribute lookups of `Record`,
+    which dominate the cost of encoding long lists, while naming the columns keeps the result
+    independent of the table's column order.
+    """
+    get = operator.itemgetter(*columns)
+    return (get(record._mapping) for record in records)
+
+
+def _backend_options(url: databases.DatabaseURL) -> dict:
+    if url.dialect == "sqlite":
+        # `cached_statements` is passed to `sqlite3.connect`; SQLite has no pool to size.
+        return {"cached_statements": settings.database_statement_cache_size, "init_script": _sqlite_pragmas()}
+    return {
+        "min_size": settings.database_pool_min_size,
+        "max_size": settings.database_pool_max_size,
+        "statement_cache_size": settings.database_statement_cache_size,
+    }
+
+
+def _sqlite_pragmas() -> str:
+    # WAL lets readers run while the writer commits; with WAL, synchronous=NORMAL only syncs at
+    # checkpoints and stays durable against application crashes.
+    return (
+        f"PRAGMA journal_mode={settings.sqlite_journal_mode};"
+        f"PRAGMA synchronous={settings.sqlite_synchronous};"
+        f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms};"
+        f"PRAGMA mmap_size={settings.sqlite_mmap_size};"
+    )
+
+
+def sync_database_url(url: str) -> sa.URL:
+    """URL for the synchronous engine used by migrations and test setup: asyncpg becomes psycopg."""
+    sync_url = sa.make_url(url)
+    if sync_url.get_backend_name() == "postgresql":
+        return sync_url.set(drivername="postgresql+psycopg")
+    return sync_url
+
+
+database_url = databases.DatabaseURL(settings.database_url)
+database = InstrumentedDatabase(
+    settings.database_url,
+    pool_size=settings.database_pool_max_size,
+    acquire_timeout=settings.database_pool_acquire_timeout_seconds,
+    **_backend_options(database_url),
+)
 metadata = sa.MetaData()
 
-if settings.environment == "production":
-    engine = sa.create_engine(settings.database_url)
+if database_url.dialect == "sqlite":
+    engine = sa.create_engine(sync_database_url(settings.database_url), connect_args={"check_same_thread": False})
 else:
-    engine = sa.create_engine(settings.database_url, connect_args={"check_same_thread": False})
\ No newline at end of file
+    engine = sa.create_engine(sync_database_url(settings.database_url))
+
+registry.register(GaugeCallback("db_pool_max_size", "Maximum database connections.", lambda: {(): database.limiter.max_size}))
+registry.register(GaugeCallback("db_pool_in_use", "Database connections checked out.", lambda: {(): database.limiter.in_use}))
+registry.register(GaugeCallback("db_pool_waiters", "Callers waiting for a database connection.", lambda: {(): database.limiter.waiters}))
@@ -0,0 +1,24 @@
+"""
+Weak ETags for conditional GETs.
+
+Every write to an account row bumps its `version`, and a new transaction always goes through a
+balance update, so `(id, version)` identifies both the account and its transaction history
+without serializing either body.
+"""
+from databases.interfaces import Record
+
+
+def account_etag(account: dict | Record) -> str:
+    """Builds the weak ETag of an account from its `id` and `version`."""
+    return f'W/"{account["id"]}-{account["version"]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Tells whether an `If-None-Match` header matches `etag`, using the weak comparison of RFC 9110."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
@@ -15,4 +15,24 @@ class BusinessError(Exception):
 
 
 class ForbiddenAccountAccess(Exception):
+    pass
+
+
+class InvalidCursorError(Exception):
+    pass
+
+
+class IdempotencyKeyReusedError(Exception):
+    pass
+
+
+class DatabasePoolTimeoutError(Exception):
+    pass
+
+
+class RateLimitedError(Exception):
+    pass
+
+
+class InvalidTokenError(Exception):
     pass
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""
+In-process, per-account serialization of balance mutations.
+
+Locks come from a fixed table of stripes, so memory stays bounded however many accounts there
+are: an account always maps to the same stripe, and two accounts only wait on each other when
+they share one, which a large enough table makes rare. The locks only coordinate coroutines of
+one worker process; the database still guards against other workers.
+
+They are off when the SQLite single writer is on: it already applies every write in turn, and
+holding a lock across `writer.run` would keep an account's writes out of each other's batches.
+They are also skipped inside an enclosing `writer.run` operation, e.g. under an Idempotency-Key:
+a lock is otherwise taken before a connection, and a caller already holding one while it waits
+for the lock could starve the lock holder of the pool. The row locks still serialize it.
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Hashable
+
+from src.config import settings
+from src.metrics import GaugeCallback, Histogram, registry
+from src.writer import writer
+
+account_lock_wait_seconds = registry.register(
+    Histogram("account_lock_wait_seconds", "Time spent waiting for per-account locks.")
+)
+
+
+class StripedLocks:
+    def __init__(self, stripes: int, enabled: bool = True):
+        self.stripes = stripes
+        self.enabled = enabled
+        self.waiters = [0] * stripes
+        # Total wait per stripe, only for stripes that have ever been contended.
+        self.wait_seconds: dict[int, float] = {}
+        self._locks: list[asyncio.Lock] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def stripe(self, key: Hashable) -> int:
+        return hash(key) % self.stripes
+
+    @asynccontextmanager
+    async def hold(self, *keys: Hashable) -> AsyncIterator[None]:
+        """
+        Holds the locks of all `keys` for the duration of the block.
+
+        Stripes are acquired in ascending order, so callers locking overlapping sets of keys,
+        like the two accounts of opposite transfers, cannot deadlock. Nothing is held when the
+        caller already runs in a writer transaction.
+        """
+        if not self.enabled or writer.in_transaction:
+            yield
+            return
+
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # asyncio locks belong to one event loop; a new loop (e.g. a new test) gets new ones.
+            self._locks = [asyncio.Lock() for _ in range(self.stripes)]
+            self._loop = loop
+
+        held: list[asyncio.Lock] = []
+        start = time.perf_counter()
+        try:
+            for stripe in sorted({self.stripe(key) for key in keys}):
+                lock = self._locks[stripe]
+                if lock.locked():
+                    await self.__wait(stripe, lock)
+                else:
+                    await lock.acquire()
+                held.append(lock)
+            account_lock_wait_seconds.observe(time.perf_counter() - start)
+            yield
+        finally:
+            for lock in reversed(held):
+                lock.release()
+
+    async def __wait(self, stripe: int, lock: asyncio.Lock) -> None:
+        start = time.perf_counter()
+        self.waiters[stripe] += 1
+        try:
+            await lock.acquire()
+        finally:
+            self.waiters[stripe] -= 1
+            self.wait_seconds[stripe] = self.wait_seconds.get(stripe, 0) + time.perf_counter() - start
+
+
+account_locks = StripedLocks(stripes=settings.account_lock_stripes, enabled=not writer.enabled)
+
+registry.register(GaugeCallback(
+    "account_lock_waiters",
+    "Coroutines queued on a per-account lock stripe.",
+    lambda: {(stripe,): waiters for stripe, waiters in enumerate(account_locks.waiters) if waiters},
+    labelnames=("stripe",),
+))
+registry.register(GaugeCallback(
+    "account_lock_contended_seconds_total",
+    "Time spent queued on each contended per-account lock stripe.",
+    lambda: {(stripe,): seconds for stripe, seconds in account_locks.wait_seconds.items()},
+    labelnames=("stripe",),
+    type="counter",
+))
@@ -1,16 +1,28 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from src.controllers import user, account, auth, transaction
-from src.database import database
+from src.controllers import user, account, auth, transaction, metrics
+from src.database import QueryStatsMiddleware, database
+from src.exceptions import DatabasePoolTimeoutError
+from src.metrics import MetricsMiddleware
+from src.services.revocation import revocations
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await database.connect()
+    await revocations.sync()
+    purge_task = asyncio.create_task(transaction.idempotency_service.purge_expired_periodically())
+    revocation_task = asyncio.create_task(revocations.sync_periodically())
     yield
+    for task in (purge_task, revocation_task):
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
     await database.disconnect()
 
 
@@ -69,9 +81,22 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+
+
+@app.exception_handler(DatabasePoolTimeoutError)
+async def database_pool_timeout_handler(request: Request, exc: DatabasePoolTimeoutError):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Service temporarily unavailable"},
+        headers={"Retry-After": "1"},
+    )
+
 
 #app.include_router(auth.router, tags=["auth"])
 app.include_router(user.router, tags=["user"])
 app.include_router(account.router, tags=["account"])
 app.include_router(auth.router, tags=["auth"])
-app.include_router(transaction.router, tags=["transaction"])
\ No newline at end of file
+app.include_router(transaction.router, tags=["transaction"])
+app.include_router(metrics.router)
@@ -10,4 +10,6 @@ accounts = sa.Table(
     sa.Column("user_id", sa.Integer, nullable=False, index=True),
     sa.Column("balance", sa.Numeric(10, 2), nullable=False, default=0),
     sa.Column("created_at", sa.TIMESTAMP(timezone=True), default=sa.func.now()),
+    # Bumped by every write to the row; conditional GETs derive their ETag from it.
+    sa.Column("version", sa.Integer, nullable=False, server_default="0"),
 )
\ No newline at end of file
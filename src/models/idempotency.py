@@ -0,0 +1,14 @@
+import sqlalchemy as sa
+
+from src.database import metadata
+
+
+idempotency_keys = sa.Table(
+    "idempotency_keys",
+    metadata,
+    sa.Column("key", sa.String(255), primary_key=True),
+    sa.Column("request_hash", sa.String(64), nullable=False),
+    sa.Column("response", sa.JSON, nullable=False),
+    sa.Column("expires_at", sa.TIMESTAMP(timezone=True), nullable=False, index=True),
+    sa.Column("created_at", sa.TIMESTAMP(timezone=True), default=sa.func.now()),
+)
@@ -0,0 +1,14 @@
+import sqlalchemy as sa
+
+from src.database import metadata
+
+
+revoked_tokens = sa.Table(
+    "revoked_tokens",
+    metadata,
+    sa.Column("jti", sa.String(64), primary_key=True),
+    # Set on rows revoking every token of a subject issued up to `revoked_at`, rather than one token.
+    sa.Column("sub", sa.String(64), nullable=True),
+    sa.Column("revoked_at", sa.TIMESTAMP(timezone=True), nullable=False, index=True),
+    sa.Column("expires_at", sa.TIMESTAMP(timezone=True), nullable=False, index=True),
+)
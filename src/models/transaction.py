@@ -1,6 +1,7 @@
 from enum import Enum
 
 import sqlalchemy as sa
+from sqlalchemy.dialects import sqlite
 
 from src.database import metadata
 
@@ -8,6 +9,8 @@ from src.database import metadata
 class TransactionType(str, Enum):
     DEPOSIT = "DEPOSIT"
     WITHDRAWAL = "WITHDRAWAL"
+    TRANSFER_IN = "TRANSFER_IN"
+    TRANSFER_OUT = "TRANSFER_OUT"
 
 
 transactions = sa.Table(
@@ -17,5 +20,12 @@ transactions = sa.Table(
     sa.Column("account_id", sa.Integer, sa.ForeignKey("accounts.id"), nullable=False),
     sa.Column("type", sa.Enum(TransactionType, name="transaction_types"), nullable=False),
     sa.Column("amount", sa.Numeric(10, 2), nullable=False),
-    sa.Column("timestamp", sa.TIMESTAMP(timezone=True), default=sa.func.now()),
+    # SQLite's CURRENT_TIMESTAMP has no fractional seconds; binding cursor values in the same
+    # format keeps keyset comparisons on (timestamp, id) exact.
+    sa.Column(
+        "timestamp",
+        sa.TIMESTAMP(timezone=True).with_variant(sqlite.DATETIME(truncate_microseconds=True), "sqlite"),
+        default=sa.func.now(),
+    ),
+    sa.Index("ix_transactions_account_id_timestamp_id", "account_id", "timestamp", "id"),
 )
\ No newline at end of file
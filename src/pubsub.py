@@ -0,0 +1,79 @@
+"""
+In-process publish/subscribe of account events.
+
+Each subscriber owns a bounded queue, and publishing is a `put_nowait` per subscriber of an
+event that was encoded once, so a write never waits on a reader. A subscriber whose queue is
+full has fallen behind: it is dropped rather than allowed to grow without bound or to hold up
+the others, and its stream ends so the client can reconnect and read the current state again.
+
+An idle subscriber costs a queue and a pending `get`, which is what lets one worker hold tens of
+thousands of open streams. Events only reach subscribers connected to the worker that committed
+the write.
+"""
+import asyncio
+from typing import Hashable
+
+from src.config import settings
+from src.metrics import Counter, GaugeCallback, registry
+
+pubsub_dropped_subscribers_total = registry.register(
+    Counter("pubsub_dropped_subscribers_total", "Subscribers dropped because their queue was full.")
+)
+
+
+class Subscription:
+    def __init__(self, key: Hashable, maxsize: int):
+        self.key = key
+        self.queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize)
+        self.dropped = False
+
+    async def get(self) -> bytes | None:
+        """Waits for the next event; None means the subscriber was dropped."""
+        return await self.queue.get()
+
+
+class Broker:
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.subscribers: dict[Hashable, set[Subscription]] = {}
+
+    def subscribe(self, key: Hashable) -> Subscription:
+        subscription = Subscription(key, self.queue_size)
+        self.subscribers.setdefault(key, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self.subscribers.get(subscription.key)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self.subscribers[subscription.key]
+
+    def has_subscribers(self, key: Hashable) -> bool:
+        return key in self.subscribers
+
+    def publish(self, key: Hashable, event: bytes) -> None:
+        for subscription in list(self.subscribers.get(key, ())):
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.__drop(subscription)
+
+    def __drop(self, subscription: Subscription) -> None:
+        self.unsubscribe(subscription)
+        subscription.dropped = True
+        # Pending events are discarded to make room for the end-of-stream marker.
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+        pubsub_dropped_subscribers_total.inc()
+
+
+account_events = Broker(queue_size=settings.stream_queue_size)
+
+registry.register(GaugeCallback(
+    "pubsub_subscribers",
+    "Open account event subscriptions.",
+    lambda: {(): sum(map(len, account_events.subscribers.values()))},
+))
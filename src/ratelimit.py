@@ -0,0 +1,140 @@
+"""
+Admission control for logins.
+
+Every login costs a bcrypt verification, so a credential-stuffing burst can take all the CPU the
+other routes need. Attempts are limited per client IP and per CPF by token buckets, and
+verifications in flight are capped worker-wide. Rejections raise `RateLimitedError` without
+waiting and before any bcrypt work (the rate limits even before the user lookup), so a
+turned-away attempt is cheap and its client learns at once when to retry.
+
+Like the per-account locks, the limits are per worker process.
+"""
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Hashable, Iterator
+
+from src.config import settings
+from src.exceptions import RateLimitedError
+from src.metrics import GaugeCallback, registry
+
+
+class TokenBuckets:
+    """
+    One token bucket per key, `burst` tokens deep and refilled at `rate` tokens per second.
+
+    Buckets are kept in their GCRA form: a single float per key, the time at which the bucket
+    will be full again. Only `maxsize` keys are tracked; past that the least recently used one is
+    forgotten, which at worst hands a full bucket to a key that has been quiet the longest.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int, maxsize: int, enabled: bool = True):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.maxsize = maxsize
+        self.enabled = enabled
+        self.rejected = 0
+        self._full_at: OrderedDict[Hashable, float] = OrderedDict()
+        limiters[name] = self
+
+    def __len__(self) -> int:
+        return len(self._full_at)
+
+    def take(self, key: Hashable) -> None:
+        """Spends a token of `key`, raising RateLimitedError with the wait for the next one if there is none."""
+        if not self.enabled:
+            return
+
+        now = time.monotonic()
+        interval = 1 / self.rate
+        full_at = max(self._full_at.get(key, now), now) + interval
+        wait = full_at - now - self.burst * interval
+        if wait > 0:
+            self.rejected += 1
+            raise RateLimitedError(wait)
+
+        self._full_at[key] = full_at
+        self._full_at.move_to_end(key)
+        if len(self._full_at) > self.maxsize:
+            self._full_at.popitem(last=False)
+
+    def clear(self) -> None:
+        self._full_at.clear()
+        self.rejected = 0
+
+
+class ConcurrencyLimit:
+    """Caps concurrent work without queueing: past `limit`, callers are turned away at once."""
+
+    def __init__(self, name: str, limit: int, retry_after: float, enabled: bool = True):
+        self.name = name
+        self.limit = limit
+        self.retry_after = retry_after
+        self.enabled = enabled
+        self.in_flight = 0
+        self.rejected = 0
+        limiters[name] = self
+
+    @contextmanager
+    def hold(self) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+
+        if self.in_flight >= self.limit:
+            self.rejected += 1
+            raise RateLimitedError(self.retry_after)
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+    def clear(self) -> None:
+        self.rejected = 0
+
+
+limiters: dict[str, TokenBuckets | ConcurrencyLimit] = {}
+
+login_ip_buckets = TokenBuckets(
+    "login_ip",
+    rate=settings.login_ip_rate_per_minute / 60,
+    burst=settings.login_ip_burst,
+    maxsize=settings.login_rate_limit_keys,
+    enabled=settings.login_admission_control,
+)
+login_cpf_buckets = TokenBuckets(
+    "login_cpf",
+    rate=settings.login_cpf_rate_per_minute / 60,
+    burst=settings.login_cpf_burst,
+    maxsize=settings.login_rate_limit_keys,
+    enabled=settings.login_admission_control,
+)
+# A verification takes a fraction of a second, so a rejected client may retry right away.
+password_verifications = ConcurrencyLimit(
+    "password_verifications",
+    limit=settings.login_max_concurrent_verifications,
+    retry_after=1,
+    enabled=settings.login_admission_control,
+)
+
+registry.register(GaugeCallback(
+    "rate_limited_total",
+    "Requests turned away by a rate or concurrency limit.",
+    lambda: {(name,): limiter.rejected for name, limiter in limiters.items()},
+    labelnames=("limiter",),
+    type="counter",
+))
+registry.register(GaugeCallback(
+    "rate_limit_keys",
+    "Keys tracked by a token bucket table.",
+    lambda: {(name,): len(limiter) for name, limiter in limiters.items() if isinstance(limiter, TokenBuckets)},
+    labelnames=("limiter",),
+))
+registry.register(GaugeCallback(
+    "password_verifications_in_flight",
+    "Login password verifications currently running.",
+    lambda: {(): password_verifications.in_flight},
+))
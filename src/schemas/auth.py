@@ -3,4 +3,12 @@ from pydantic import BaseModel
 
 class LoginIn(BaseModel):
     cpf: str
-    password: str
\ No newline at end of file
+    password: str
+
+
+class RefreshIn(BaseModel):
+    refresh_token: str
+
+
+class LogoutIn(BaseModel):
+    refresh_token: str | None = None
\ No newline at end of file
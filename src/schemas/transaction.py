@@ -1,16 +1,34 @@
 from enum import Enum
 
-from pydantic import BaseModel, PositiveFloat
+from pydantic import BaseModel, PositiveFloat, model_validator
 
 
 class TransactionType(str, Enum):
     DEPOSIT = "DEPOSIT"
     WITHDRAWAL = "WITHDRAWAL"
 
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
 class TransactionIn(BaseModel):
     account_id: int
     type: TransactionType
     amount: PositiveFloat
 
     class Config:
-        use_enum_values = True
\ No newline at end of file
+        use_enum_values = True
+
+
+class TransferIn(BaseModel):
+    source_account_id: int
+    destination_account_id: int
+    amount: PositiveFloat
+
+    @model_validator(mode="after")
+    def check_distinct_accounts(self) -> "TransferIn":
+        if self.source_account_id == self.destination_account_id:
+            raise ValueError("Source and destination accounts must be different")
+        return self
@@ -8,6 +8,11 @@ class Role(str, Enum):
     CLIENT = "CLIENT"
 
 
+class ImportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
 class UserIn(BaseModel):
     name: str
     cpf: str = Field(..., pattern=r'^\d{11}$', description="CPF")
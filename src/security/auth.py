@@ -1,6 +1,12 @@
 from passlib.context import CryptContext
 
+import asyncio
+import hashlib
+import multiprocessing
+import os
 import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from typing import Annotated
 from uuid import uuid4
 
@@ -9,6 +15,12 @@ from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer
 from pydantic import BaseModel
 from src.config import settings
+from src.metrics import GaugeCallback, registry
+from src.services.revocation import revocations
+
+ACCESS_AUDIENCE = "desafio-bank"
+# Refresh tokens have their own audience, so one can never be used as an access token.
+REFRESH_AUDIENCE = "desafio-bank-refresh"
 
 
 class AccessToken(BaseModel):
@@ -26,7 +38,14 @@ class JWTToken(BaseModel):
     access_token: AccessToken
 
 
-password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+password_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
+
+# bcrypt releases the GIL while hashing, so a small thread pool keeps it off the event loop.
+password_executor = ThreadPoolExecutor(max_workers=settings.password_hash_workers, thread_name_prefix="password-hash")
+
+# Bulk imports hash across processes instead, one per core, started on first use. Spawned
+# rather than forked: the parent runs database threads that a fork would copy mid-flight.
+_password_process_pool: ProcessPoolExecutor | None = None
 
 
 def sign_jwt(user_id: str, role: str) -> JWTToken:
@@ -45,33 +64,116 @@ def sign_jwt(user_id: str, role: str) -> JWTToken:
         - `sub` (Subject): The unique identifier of the user (`user_id`).
         - `rol` (Role): The user's role.
         - `aud` (Audience): The intended audience, set to "desafio-bank".
-        - `exp` (Expiration): The timestamp when the token expires.
+        - `exp` (Expiration): The timestamp when the token expires, `settings.access_token_ttl_seconds` from now.
         - `iat` (Issued At): The timestamp when the token was issued.
         - `nbf` (Not Before): The timestamp before which the token is not valid.
         - `jti` (JWT ID): A unique identifier for the token.
 
     The JWT is signed using the secret and algorithm specified in the `settings`.
     """
+    return {"access_token": _encode_jwt(user_id, role, ACCESS_AUDIENCE, settings.access_token_ttl_seconds)}
+
+
+def sign_refresh_jwt(user_id: str, role: str) -> str:
+    """
+    Generate a refresh token, which `POST /auth/refresh` exchanges for a new access token.
+
+    It has the same claims as an access token, but the "desafio-bank-refresh" audience and an
+    expiry `settings.refresh_token_ttl_seconds` from now.
+    """
+    return _encode_jwt(user_id, role, REFRESH_AUDIENCE, settings.refresh_token_ttl_seconds)
+
+
+def _encode_jwt(user_id: str, role: str, audience: str, ttl_seconds: int) -> str:
     now = time.time()
     payload = {
         "iss": "desafio-bank.com.br",
         "sub": user_id,
         "rol": role,
-        "aud": "desafio-bank",
-        "exp": now + (60 * 30),  # 30 minutes
+        "aud": audience,
+        "exp": now + ttl_seconds,
         "iat": now,
         "nbf": now,
         "jti": uuid4().hex,
     }
-    token = jwt.encode(payload, settings.secret, algorithm=settings.algorithm)
-    return {"access_token": token}
+    return jwt.encode(payload, settings.secret, algorithm=settings.algorithm)
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of verified tokens, keyed by the SHA-256 digest of the raw token.
+
+    Entries are only served until the token's `exp`. A tampered token has a different digest,
+    so it always misses and goes through the full signature check.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, JWTToken] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> JWTToken | None:
+        key = hashlib.sha256(token.encode()).digest()
+        entry = self._entries.get(key)
+        if entry is None or entry.access_token.exp < time.time():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(self, token: str, value: JWTToken) -> None:
+        if self.maxsize <= 0:
+            return
+
+        key = hashlib.sha256(token.encode()).digest()
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+token_cache = TokenCache(maxsize=settings.token_cache_size)
+
+registry.register(GaugeCallback("token_cache_hits_total", "Tokens served from the verified-token cache.", lambda: {(): token_cache.hits}, type="counter"))
+registry.register(GaugeCallback("token_cache_misses_total", "Tokens that went through the full signature check.", lambda: {(): token_cache.misses}, type="counter"))
+registry.register(GaugeCallback("token_cache_size", "Tokens held by the verified-token cache.", lambda: {(): len(token_cache)}))
 
 
 async def decode_jwt(token: str) -> JWTToken | None:
+    cached = token_cache.get(token)
+    if cached:
+        return cached
+
     try:
-        decoded_token = jwt.decode(token, settings.secret, audience="desafio-bank", algorithms=[settings.algorithm])
+        decoded_token = jwt.decode(token, settings.secret, audience=ACCESS_AUDIENCE, algorithms=[settings.algorithm])
         _token = JWTToken.model_validate({"access_token": decoded_token})
-        return _token if _token.access_token.exp >= time.time() else None
+    except Exception:
+        return None
+
+    if _token.access_token.exp < time.time():
+        return None
+
+    token_cache.set(token, _token)
+    return _token
+
+
+def decode_refresh_jwt(token: str) -> AccessToken | None:
+    """Returns the claims of a validly signed, unexpired refresh token, or None; revocation is up to the caller."""
+    try:
+        return AccessToken.model_validate(jwt.decode(token, settings.secret, audience=REFRESH_AUDIENCE, algorithms=[settings.algorithm]))
     except Exception:
         return None
     
@@ -97,6 +199,13 @@ class JWTBearer(HTTPBearer):
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Invalid or expired token.",
                 )
+            # Checked after the token cache, so a cached token is still caught once revoked.
+            token = payload.access_token
+            if revocations.is_revoked(token.jti, token.sub, token.iat):
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Token has been revoked.",
+                )
             return payload
         else:
             raise HTTPException(
@@ -121,3 +230,34 @@ def hash_password(password: str) -> str:
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return password_context.verify(plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, hash_password, password)
+
+
+def hash_passwords(passwords: list[str]) -> list[str]:
+    return [hash_password(password) for password in passwords]
+
+
+async def hash_passwords_parallel(passwords: list[str]) -> list[str]:
+    """Hashes `passwords` across the password process pool, keeping their order."""
+    global _password_process_pool
+    workers = settings.password_import_processes or os.cpu_count() or 1
+    if _password_process_pool is None:
+        _password_process_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+    # One slice per process keeps the pickling overhead to a few round trips per chunk.
+    size = -(-len(passwords) // workers) or 1
+    loop = asyncio.get_running_loop()
+    slices = await asyncio.gather(*[
+        loop.run_in_executor(_password_process_pool, hash_passwords, passwords[start:start + size])
+        for start in range(0, len(passwords), size)
+    ])
+    return [hashed for hashes in slices for hashed in hashes]
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, verify_password, plain_password, hashed_password)
@@ -1,10 +1,25 @@
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator
+
 from databases.interfaces import Record
 
+from src.cache import MemoryBackend, ReadThroughCache
+from src.config import settings
 from src.exceptions import AccountNotFoundError, UserNotFoundError
 from src.database import database
+from src.locks import account_locks
 from src.models.account import accounts
+from src.models.user import users
+from src.pubsub import account_events
 from src.schemas.account import AccountIn
+from src.security.auth import AccessToken
+from src.services.revocation import revocations
 from src.services.user import UserService
+from src.writer import writer
+
+account_cache = ReadThroughCache("accounts", MemoryBackend(settings.read_cache_size), ttl=settings.read_cache_ttl_seconds)
 
 
 class AccountService:
@@ -18,15 +33,44 @@ class AccountService:
             balance = account.balance,
         ) 
 
-        return await database.execute(command)
+        return await writer.run(lambda: database.execute(command))
     
+    async def create_many(self, accounts_in: list[AccountIn]) -> list[Record]:
+        user_ids = {account.user_id for account in accounts_in}
+        query = users.select().with_only_columns(users.c.id).where(users.c.id.in_(user_ids))
+        missing = user_ids - {record.id for record in await database.fetch_all(query)}
+        if missing:
+            raise UserNotFoundError(sorted(missing))
+
+        async def insert() -> list[Record]:
+            created = []
+            chunk_size = settings.account_bulk_chunk_size
+            for start in range(0, len(accounts_in), chunk_size):
+                values = [account.model_dump() for account in accounts_in[start:start + chunk_size]]
+                command = accounts.insert().values(values).returning(accounts.c.id, accounts.c.user_id, accounts.c.balance)
+                # RETURNING gives no order guarantee; ids are assigned in VALUES order.
+                created.extend(sorted(await database.fetch_all(command), key=lambda record: record.id))
+            return created
+
+        return await writer.run(insert)
+
+    async def read_many(self, ids: list[int]) -> list[Record]:
+        query = accounts.select().where(accounts.c.id.in_(ids))
+        found = {record.id: record for record in await database.fetch_all(query)}
+
+        return [found[id] for id in dict.fromkeys(ids) if id in found]
+
     async def read_all(self, limit: int, skip: int = 0) -> list[Record]:
         query = accounts.select().limit(limit).offset(skip)
 
         return await database.fetch_all(query)
 
-    async def read(self, id: int) -> Record:
-        return await self.__get_by_id(id)
+    async def read(self, id: int) -> dict:
+        account = await account_cache.get(id, lambda: self.__load(id))
+        if not account:
+            raise AccountNotFoundError
+
+        return account
     
     async def read_by_user_id(self, user_id: int) -> list[Record]:
         total = await self.count_user_id(user_id)
@@ -37,20 +81,72 @@ class AccountService:
 
         return await database.fetch_all(query)
     
-    async def update(self, id: int, account: AccountIn) -> Record:
-        total = await self.count(id)
-        if not total:
-            raise AccountNotFoundError
+    async def stream(self, id: int, token: AccessToken | None = None) -> AsyncIterator[bytes]:
+        """
+        Streams an account's activity as Server-Sent Events.
+
+        The first event is a `balance` snapshot; then every committed transaction arrives as a
+        `transaction` event carrying the balance it left. A comment is sent after
+        `settings.stream_heartbeat_seconds` of silence so proxies keep the connection open. A
+        subscriber that falls `settings.stream_queue_size` events behind gets a `dropped` event
+        and the stream ends; the client reconnects and starts again from a fresh snapshot.
+        Access must be checked with `TransactionService.check_account_access` first.
+
+        The stream is bound to the `token` it was opened with: it gets an `unauthorized` event and
+        ends once the token expires, or at the next event or heartbeat after it is revoked.
+
+        Args:
+            id (int): The ID of the account to follow.
+            token (AccessToken | None): The subscriber's access token, or None for no time limit.
+
+        Yields:
+            bytes: Encoded events.
+
+        Raises:
+            AccountNotFoundError: If the account does not exist when the stream starts.
+        """
+        # Subscribing before the snapshot is read means no transaction can fall in between.
+        subscription = account_events.subscribe(id)
+        try:
+            account = await self.read(id)
+            yield f"event: balance\ndata: {json.dumps({'balance': float(account['balance'])})}\n\n".encode()
 
+            while True:
+                timeout = settings.stream_heartbeat_seconds
+                if token is not None:
+                    timeout = max(min(timeout, token.exp - time.time()), 0)
+                try:
+                    async with asyncio.timeout(timeout):
+                        event = await subscription.get()
+                except TimeoutError:
+                    event = b": keepalive\n\n"
+
+                if token is not None and (token.exp <= time.time() or revocations.is_revoked(token.jti, token.sub, token.iat)):
+                    yield b"event: unauthorized\ndata: {}\n\n"
+                    return
+                if event is None:
+                    yield b"event: dropped\ndata: {}\n\n"
+                    return
+                yield event
+        finally:
+            account_events.unsubscribe(subscription)
+
+    async def update(self, id: int, account: AccountIn) -> Record:
         data = account.model_dump(exclude_unset=True)
-        command = accounts.update().where(accounts.c.id == id).values(**data)
-        await database.execute(command)
+        command = accounts.update().where(accounts.c.id == id).values(**data, version=accounts.c.version + 1).returning(accounts)
+        async with account_locks.hold(id):
+            updated = await writer.run(lambda: database.fetch_one(command))
+            await writer.after_commit(account_cache.invalidate, id)
+        if not updated:
+            raise AccountNotFoundError
 
-        return await self.__get_by_id(id)
+        return updated
 
     async def delete(self, id: int) -> None:
         command = accounts.delete().where(accounts.c.id == id)
-        await database.execute(command)
+        async with account_locks.hold(id):
+            await writer.run(lambda: database.execute(command))
+            await writer.after_commit(account_cache.invalidate, id)
 
     @staticmethod
     async def count(id: int) -> int:
@@ -65,10 +161,6 @@ class AccountService:
 
         return result.total
     
-    async def __get_by_id(self, id: int) -> Record:
-        query = accounts.select().where(accounts.c.id == id)
-        account = await database.fetch_one(query)
-        if not account:
-            raise AccountNotFoundError
-        
-        return account
\ No newline at end of file
+    async def __load(self, id: int) -> dict | None:
+        account = await database.fetch_one(accounts.select().where(accounts.c.id == id))
+        return dict(account._mapping) if account else None
\ No newline at end of file
@@ -1,15 +1,69 @@
-from src.exceptions import IncorrectUserInformationError
+import re
+
+from src.exceptions import IncorrectUserInformationError, InvalidTokenError
 from src.database import database
 from src.models.user import users
-from src.security.auth import verify_password
+from src.ratelimit import login_cpf_buckets, login_ip_buckets, password_verifications
+from src.security.auth import AccessToken, decode_refresh_jwt, verify_password_async
+from src.services.revocation import revocations
+
+CPF_PATTERN = re.compile(r"\d{11}")
 
 
 class AuthService:
-    async def login(self, cpf, password):
+    async def login(self, cpf, password, client_ip):
+        # Admission is decided before any query or bcrypt work; see src/ratelimit.py.
+        login_ip_buckets.take(client_ip)
+        # No user has a malformed CPF, and keying buckets on one would let junk values of any
+        # size push real accounts' buckets out of the table.
+        if not CPF_PATTERN.fullmatch(cpf):
+            raise IncorrectUserInformationError
+        login_cpf_buckets.take(cpf)
+
         query = users.select().where(users.c.cpf == cpf)
         user = await database.fetch_one(query)
 
-        if not user or not verify_password(password, user.password):
+        if not user:
             raise IncorrectUserInformationError
+
+        with password_verifications.hold():
+            if not await verify_password_async(password, user.password):
+                raise IncorrectUserInformationError
         
-        return user
\ No newline at end of file
+        return user
+
+    async def refresh(self, refresh_token: str) -> AccessToken:
+        """
+        Spends a refresh token, returning its claims so a new token pair can be issued.
+
+        Refresh tokens are single use: the token is revoked here, so a new refresh token must be
+        issued along with the new access token. Presenting one that was already spent means it
+        was copied (or was logged out), so every token of its subject is revoked and the user
+        must log in again.
+
+        Args:
+            refresh_token (str): A refresh token issued with `sign_refresh_jwt`.
+
+        Returns:
+            AccessToken: The claims of the spent token.
+
+        Raises:
+            InvalidTokenError: If the token is invalid, expired, revoked or was already spent.
+        """
+        claims = decode_refresh_jwt(refresh_token)
+        if not claims or revocations.is_cut_off(claims.sub, claims.iat):
+            raise InvalidTokenError
+
+        if not await revocations.revoke(claims.jti, claims.exp):
+            await revocations.revoke_subject(claims.sub)
+            raise InvalidTokenError
+
+        return claims
+
+    async def logout(self, token: AccessToken, refresh_token: str | None = None) -> None:
+        """Revokes the access token and, when given, the subject's refresh token that goes with it."""
+        await revocations.revoke(token.jti, token.exp)
+
+        claims = decode_refresh_jwt(refresh_token) if refresh_token else None
+        if claims and claims.sub == token.sub:
+            await revocations.revoke(claims.jti, claims.exp)
\ No newline at end of file
@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, NamedTuple
+
+import sqlalchemy as sa
+
+from src.config import settings
+from src.database import database
+from src.exceptions import IdempotencyKeyReusedError
+from src.models.idempotency import idempotency_keys
+from src.writer import writer
+
+logger = logging.getLogger(__name__)
+
+
+class StoredResponse(NamedTuple):
+    request_hash: str
+    response: Any
+    expires_at: float
+
+
+class IdempotencyService:
+    """
+    Runs an operation at most once per idempotency key and replays its stored response.
+
+    Responses are persisted in `idempotency_keys` in the same DB transaction as the operation and
+    mirrored in a bounded in-memory LRU, so a retried request is answered without touching the
+    rest of the schema. Concurrent requests with the same key in this process wait for the first
+    one instead of running the operation again.
+    """
+
+    def __init__(self, cache_size: int = settings.idempotency_cache_size, ttl_seconds: int = settings.idempotency_key_ttl_seconds):
+        self.cache_size = cache_size
+        self.ttl_seconds = ttl_seconds
+        self._cache: OrderedDict[str, StoredResponse] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Future] = {}
+
+    async def run(self, key: str, request_hash: str, operation: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """
+        Runs `operation` once for `key`, or replays the response stored for it.
+
+        Args:
+            key (str): The idempotency key, already scoped to the caller.
+            request_hash (str): A digest of the request, used to reject a key reused for another request.
+            operation (Callable[[], Awaitable[Any]]): Performs the request and returns a JSON-serializable response.
+
+        Returns:
+            tuple[Any, bool]: The response and whether it was replayed.
+
+        Raises:
+            IdempotencyKeyReusedError: If the key was already used with a different request.
+        """
+        stored = self.__get_cached(key) or await self.__load(key)
+        if stored:
+            return self.__replay(stored, request_hash), True
+
+        in_flight = self._in_flight.get(key)
+        if in_flight:
+            stored = await asyncio.shield(in_flight)
+            return self.__replay(stored, request_hash), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            stored, executed = await self.__execute(key, request_hash, operation)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as error:
+            future.set_exception(error)
+            # Only retrieved when a duplicate is waiting; avoid "exception was never retrieved".
+            future.exception()
+            raise
+        else:
+            future.set_result(stored)
+        finally:
+            del self._in_flight[key]
+
+        if executed:
+            return stored.response, False
+        return self.__replay(stored, request_hash), True
+
+    async def purge_expired(self, batch_size: int = settings.idempotency_purge_batch_size) -> int:
+        """Deletes expired keys in batches of `batch_size` and returns how many were removed."""
+        total = 0
+        while True:
+            expired = (
+                sa.select(idempotency_keys.c.key)
+                .where(idempotency_keys.c.expires_at <= datetime.now(timezone.utc))
+                .limit(batch_size)
+                .scalar_subquery()
+            )
+            command = idempotency_keys.delete().where(idempotency_keys.c.key.in_(expired)).returning(idempotency_keys.c.key)
+            deleted = len(await writer.run(lambda: database.fetch_all(command)))
+            total += deleted
+            if deleted < batch_size:
+                return total
+
+    async def purge_expired_periodically(self, interval_seconds: int = settings.idempotency_purge_interval_seconds) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.purge_expired()
+            except Exception:
+                logger.exception("Failed to purge expired idempotency keys")
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    async def __execute(self, key: str, request_hash: str, operation: Callable[[], Awaitable[Any]]) -> tuple[StoredResponse, bool]:
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds)
+
+        async def run_and_store() -> Any:
+            response = await operation()
+            command = idempotency_keys.insert().values(
+                key=key,
+                request_hash=request_hash,
+                response=response,
+                expires_at=expires_at,
+            )
+            await database.execute(command)
+            return response
+
+        try:
+            response = await writer.run(run_and_store)
+        except Exception:
+            # Another process may have stored the same key first; its insert wins and ours
+            # was rolled back together with the operation.
+            stored = await self.__load(key)
+            if not stored:
+                raise
+            return stored, False
+
+        stored = StoredResponse(request_hash, response, expires_at.timestamp())
+        self.__remember(key, stored)
+        return stored, True
+
+    async def __load(self, key: str) -> StoredResponse | None:
+        query = sa.select(idempotency_keys.c.request_hash, idempotency_keys.c.response, idempotency_keys.c.expires_at).where(
+            idempotency_keys.c.key == key,
+            idempotency_keys.c.expires_at > datetime.now(timezone.utc),
+        )
+        record = await database.fetch_one(query)
+        if not record:
+            return None
+
+        expires_at = record.expires_at
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        stored = StoredResponse(record.request_hash, record.response, expires_at.timestamp())
+        self.__remember(key, stored)
+        return stored
+
+    def __get_cached(self, key: str) -> StoredResponse | None:
+        stored = self._cache.get(key)
+        if stored is None:
+            return None
+        if stored.expires_at <= time.time():
+            del self._cache[key]
+            return None
+
+        self._cache.move_to_end(key)
+        return stored
+
+    def __remember(self, key: str, stored: StoredResponse) -> None:
+        self._cache[key] = stored
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    @staticmethod
+    def __replay(stored: StoredResponse, request_hash: str) -> Any:
+        if stored.request_hash != request_hash:
+            raise IdempotencyKeyReusedError
+        return stored.response
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.config import settings
+from src.database import database, database_url, row_values
+from src.metrics import GaugeCallback, registry
+from src.models.revoked_token import revoked_tokens
+from src.writer import writer
+
+logger = logging.getLogger(__name__)
+
+
+def _timestamp(value: datetime) -> float:
+    # SQLite hands timestamps back without their time zone; they are stored in UTC.
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class RevocationService:
+    """
+    Revoked JWTs, persisted in `revoked_tokens` and mirrored in memory.
+
+    `is_revoked` runs on every authenticated request, so it is two dict lookups and no I/O: one
+    for the token's own `jti`, as a logout revokes it, and one for a cutoff that revokes every
+    token of its subject issued until then, as a role change does. An entry is only kept until
+    the tokens it revokes would have expired anyway, so memory holds no more than the tokens
+    revoked within one token lifetime.
+
+    A revocation takes effect at once in the worker that made it, and in the other workers when
+    they next `sync`, every `settings.token_revocation_sync_seconds`.
+    """
+
+    def __init__(self):
+        # jti -> exp of the revoked token.
+        self._tokens: dict[str, float] = {}
+        # sub -> (tokens issued up to this time are revoked, until this time).
+        self._subjects: dict[str, tuple[float, float]] = {}
+        self._synced_at: datetime | None = None
+
+    def __len__(self) -> int:
+        return len(self._tokens) + len(self._subjects)
+
+    def is_revoked(self, jti: str, sub: str, iat: float) -> bool:
+        return jti in self._tokens or self.is_cut_off(sub, iat)
+
+    def is_cut_off(self, sub: str, iat: float) -> bool:
+        """Tells whether every token issued to `sub` at `iat` was revoked at once, e.g. by a role change."""
+        cutoff = self._subjects.get(sub)
+        return cutoff is not None and iat <= cutoff[0]
+
+    async def revoke(self, jti: str, exp: float) -> bool:
+        """
+        Revokes one token until its expiry.
+
+        Args:
+            jti (str): The token's `jti` claim.
+            exp (float): The token's `exp` claim; the revocation is dropped after it.
+
+        Returns:
+            bool: False if the token had already been revoked, by this worker or another one.
+        """
+        dialect = postgresql if database_url.dialect == "postgresql" else sqlite
+        command = (
+            dialect.insert(revoked_tokens)
+            .values(jti=jti, revoked_at=datetime.now(timezone.utc), expires_at=datetime.fromtimestamp(exp, timezone.utc))
+            .on_conflict_do_nothing(index_elements=[revoked_tokens.c.jti])
+            .returning(revoked_tokens.c.jti)
+        )
+        inserted = await writer.run(lambda: database.fetch_one(command))
+        self._tokens[jti] = exp
+
+        return inserted is not None
+
+    async def revoke_subject(self, sub: str) -> None:
+        """Revokes every token issued to `sub` so far, e.g. after its role changed."""
+        revoked_at = datetime.now(timezone.utc)
+        # No token issued before now can outlive the longest token lifetime.
+        expires_at = revoked_at + timedelta(seconds=max(settings.access_token_ttl_seconds, settings.refresh_token_ttl_seconds))
+        command = revoked_tokens.insert().values(jti=uuid4().hex, sub=sub, revoked_at=revoked_at, expires_at=expires_at)
+        await writer.run(lambda: database.execute(command))
+        self.__add_subject(sub, revoked_at.timestamp(), expires_at.timestamp())
+
+    async def sync(self) -> None:
+        """Loads revocations made since the last sync (all live ones the first time) and prunes expired ones."""
+        now = datetime.now(timezone.utc)
+        query = sa.select(revoked_tokens).where(revoked_tokens.c.expires_at > now)
+        if self._synced_at is not None:
+            # The overlap covers revocations committed after they were timestamped.
+            query = query.where(revoked_tokens.c.revoked_at >= self._synced_at - timedelta(seconds=settings.token_revocation_sync_seconds))
+
+        for jti, sub, revoked_at, expires_at in row_values(await database.fetch_all(query), "jti", "sub", "revoked_at", "expires_at"):
+            if sub is None:
+                self._tokens[jti] = _timestamp(expires_at)
+            else:
+                self.__add_subject(sub, _timestamp(revoked_at), _timestamp(expires_at))
+        self._synced_at = now
+
+        self.__prune(now.timestamp())
+        command = revoked_tokens.delete().where(revoked_tokens.c.expires_at <= now)
+        await writer.run(lambda: database.execute(command))
+
+    async def sync_periodically(self, interval_seconds: float = settings.token_revocation_sync_seconds) -> None:
+        while True:
+            try:
+                await self.sync()
+            except Exception:
+                logger.exception("Failed to sync revoked tokens")
+            await asyncio.sleep(interval_seconds)
+
+    def clear(self) -> None:
+        self._tokens.clear()
+        self._subjects.clear()
+        self._synced_at = None
+
+    def __add_subject(self, sub: str, revoked_at: float, expires_at: float) -> None:
+        current = self._subjects.get(sub)
+        if current is None or revoked_at > current[0]:
+            self._subjects[sub] = (revoked_at, expires_at)
+
+    def __prune(self, now: float) -> None:
+        self._tokens = {jti: exp for jti, exp in self._tokens.items() if exp > now}
+        self._subjects = {sub: cutoff for sub, cutoff in self._subjects.items() if cutoff[1] > now}
+
+
+revocations = RevocationService()
+
+registry.register(GaugeCallback("token_revocations", "Token revocations held in memory.", lambda: {(): len(revocations)}))
@@ -1,99 +1,440 @@
+import base64
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Iterable
+from datetime import datetime
+from decimal import Decimal
+
+import sqlalchemy as sa
 from databases.interfaces import Record
 
-from src.database import database
+from src.coalescer import Coalescer
+from src.config import settings
+from src.database import database, row_values
 from src.models.transaction import transactions, TransactionType
 from src.models.account import accounts
-from src.schemas.transaction import TransactionIn
+from src.schemas.transaction import ExportFormat, TransactionIn, TransferIn
 from src.schemas.user import Role
-from src.exceptions import AccountNotFoundError, BusinessError, ForbiddenAccountAccess
-from src.services.account import AccountService
+from src.locks import account_locks
+from src.pubsub import account_events
+from src.exceptions import AccountNotFoundError, BusinessError, ForbiddenAccountAccess, InvalidCursorError
+from src.services.account import AccountService, account_cache
+from src.writer import writer
+
+
+def encode_cursor(transaction: Record) -> str:
+    """Encodes the (timestamp, id) position of a transaction as an opaque, URL-safe cursor."""
+    raw = f"{transaction.timestamp.isoformat()}|{transaction.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decodes a cursor created by `encode_cursor`, raising InvalidCursorError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, id = raw.split("|")
+        return datetime.fromisoformat(timestamp), int(id)
+    except ValueError:
+        raise InvalidCursorError
+
+
+def _encode_export_chunk(account_id: int, records: list[Record], format: ExportFormat) -> bytes:
+    rows = [
+        (id, account_id, getattr(type, "value", type), float(amount), timestamp.isoformat())
+        for id, type, amount, timestamp in row_values(records, "id", "type", "amount", "timestamp")
+    ]
+    if format == ExportFormat.CSV:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode()
+
+    keys = ("id", "account_id", "type", "amount", "timestamp")
+    return "".join(json.dumps(dict(zip(keys, row))) + "\n" for row in rows).encode()
+
+
+def _encode_event(transaction: Record, balance: float) -> bytes:
+    data = {
+        "transaction": {
+            "id": transaction.id,
+            "account_id": transaction.account_id,
+            "type": getattr(transaction.type, "value", transaction.type),
+            "amount": float(transaction.amount),
+            "timestamp": transaction.timestamp.isoformat(),
+        },
+        "balance": balance,
+    }
+    return f"event: transaction\ndata: {json.dumps(data)}\n\n".encode()
+
+
+async def _publish(entries: Iterable[tuple[Record, float]]) -> None:
+    """
+    Sends committed transactions, with the balance they left, to the account's stream subscribers.
+
+    Scheduled with `writer.after_commit`, so subscribers never see a transaction that is rolled back.
+    """
+    for transaction, balance in entries:
+        # Nothing is encoded for the usual account that nobody is watching.
+        if account_events.has_subscribers(transaction.account_id):
+            account_events.publish(transaction.account_id, _encode_event(transaction, balance))
+
+
+coalescer = Coalescer(
+    enabled=settings.transaction_coalescing,
+    window=settings.transaction_coalescing_window_ms / 1000,
+    batch_size=settings.transaction_coalescing_batch_size,
+)
 
 
 class TransactionService:
-    async def create(self, transaction: TransactionIn) -> int:
+    async def create(self, transaction: TransactionIn) -> Record:
         """
         Creates a new transaction and updates the associated account's balance.
 
+        The balance change is a single conditional UPDATE ... RETURNING, so concurrent
+        withdrawals on the same account can never both spend the same balance, and the
+        ledger entry is written with INSERT ... RETURNING in the same DB transaction.
+
+        With `settings.transaction_coalescing` on, transactions for the same account arriving
+        within `settings.transaction_coalescing_window_ms` of each other are applied together,
+        in arrival order and against a running balance as in `create_batch`: one locked read,
+        one balance UPDATE and one multi-row INSERT for the whole group. A withdrawal that the
+        running balance cannot cover fails on its own, exactly as it would have alone. Inside an
+        enclosing `writer.run` operation, e.g. under an Idempotency-Key, the transaction is applied
+        directly instead: the flush commits on its own, so it could neither join the enclosing
+        transaction nor, on the SQLite writer task, ever run before that transaction ends.
+
+        Once committed, the transaction and the resulting balance are published to the
+        account's `/accounts/{id}/stream` subscribers.
+
         Args:
             transaction (TransactionIn): The transaction details, including type, amount, and account ID.
 
         Returns:
-            int: The ID of the newly created transaction.
+            Record: The newly created transaction.
 
         Raises:
             AccountNotFoundError: If the account specified in the transaction does not exist.
             BusinessError: If the transaction is a withdrawal and the account's balance is insufficient.
         """
-        query = accounts.select().where(accounts.c.id == transaction.account_id)
-        account = await database.fetch_one(query)
-        if not account:
-            raise AccountNotFoundError
+        if coalescer.enabled and not writer.in_transaction:
+            return await coalescer.run(transaction.account_id, transaction, self.__apply_coalesced)
 
         if transaction.type == TransactionType.WITHDRAWAL:
-            balance = float(account.balance) - transaction.amount
-            if balance < 0:
-                raise BusinessError
+            delta = -transaction.amount
         else:
-            balance = float(account.balance) + transaction.amount
+            delta = transaction.amount
 
-        # Create transaction entry
-        transaction_id = await self.__register_transaction(transaction)
-        # Update account balance
-        await self.__update_account_balance(transaction.account_id, balance)
+        async with account_locks.hold(transaction.account_id):
+            record, balance = await writer.run(lambda: self.__apply(transaction, delta))
+            await writer.after_commit(account_cache.invalidate, transaction.account_id)
+            await writer.after_commit(_publish, [(record, balance)])
+
+        return record
+
+    async def transfer(self, transfer: TransferIn) -> dict[str, Record]:
+        """
+        Moves money from one account to another in a single DB transaction.
+
+        Both balance updates are issued in ascending account id order, so the row locks are always
+        taken in the same order and opposite transfers between the same accounts cannot deadlock.
+        The debit and credit ledger legs are written with one multi-row INSERT ... RETURNING.
+
+        Args:
+            transfer (TransferIn): The source and destination accounts and the amount to move.
 
-        query = transactions.select().where(transactions.c.id == transaction_id)
-        
-        return await database.fetch_one(query)
+        Returns:
+            dict[str, Record]: The `debit` and `credit` ledger entries.
+
+        Raises:
+            AccountNotFoundError: If either account does not exist.
+            BusinessError: If the source account's balance is insufficient.
+        """
+        deltas = {
+            transfer.source_account_id: -transfer.amount,
+            transfer.destination_account_id: transfer.amount,
+        }
+
+        async with account_locks.hold(*deltas):
+            legs, balances = await writer.run(lambda: self.__apply_transfer(transfer, deltas))
+            await writer.after_commit(account_cache.invalidate, *deltas)
+            await writer.after_commit(_publish, [(leg, balances[leg.account_id]) for leg in legs.values()])
+
+        return {"debit": legs[TransactionType.TRANSFER_OUT], "credit": legs[TransactionType.TRANSFER_IN]}
+
+    async def create_batch(self, transactions_in: list[TransactionIn]) -> list[dict]:
+        """
+        Creates many transactions at once, reporting success or failure for each item.
+
+        Items are processed in chunks of `settings.transaction_batch_chunk_size`, each one in its
+        own DB transaction. Within a chunk the involved accounts are locked in ascending id order,
+        items are applied in request order against a running balance, every account's net delta is
+        written with one UPDATE and all accepted entries are written with one multi-row INSERT.
+
+        Args:
+            transactions_in (list[TransactionIn]): The transactions to create, in the order they must be applied.
+
+        Returns:
+            list[dict]: One result per item, in request order, with a `success` flag and either the
+                created entry's `id` and `timestamp` or the failure `detail`.
+        """
+        results = []
+        chunk_size = settings.transaction_batch_chunk_size
+        for start in range(0, len(transactions_in), chunk_size):
+            chunk = transactions_in[start:start + chunk_size]
+            account_ids = {transaction.account_id for transaction in chunk}
+            async with account_locks.hold(*account_ids):
+                outcomes, entries = await writer.run(lambda: self.__apply_in_order(chunk))
+                await writer.after_commit(account_cache.invalidate, *account_ids)
+                await writer.after_commit(_publish, entries)
+            for transaction, outcome in zip(chunk, outcomes):
+                if isinstance(outcome, Exception):
+                    results.append({**transaction.model_dump(), "success": False, "detail": str(outcome)})
+                else:
+                    results.append({**transaction.model_dump(), "id": outcome.id, "timestamp": outcome.timestamp, "success": True})
+
+        return results
 
-    async def read_all_by_account_id(self, account_id: int, current_user: dict[str, str], limit: int, skip: int, ) -> list[Record]:
+    async def read_all_by_account_id(self, account_id: int, current_user: dict[str, str], limit: int, after: str | None = None) -> dict:
         """
-        Retrieves all transactions for a given account, with pagination, 
+        Retrieves a page of transactions for a given account, ordered by (timestamp, id),
         while enforcing user permissions.
 
+        Pagination is keyset based: see `read_page`.
+
         Args:
             account_id (int): The ID of the account whose transactions are to be retrieved.
             current_user (dict[str, str]): Information about the current user, including their role and ID.
             limit (int): The maximum number of transactions to retrieve.
-            skip (int): The number of transactions to skip (for pagination).
+            after (str | None): The cursor of the previous page, or None for the first page.
 
         Returns:
-            list[Record]: A list of transactions associated with the given account.
+            dict: The page `items` and the `next_cursor`, which is None on the last page.
 
         Raises:
             AccountNotFoundError: If the account with the given ID does not exist.
             ForbiddenAccountAccess: If the current user does not have permission to access the transaction.
+            InvalidCursorError: If `after` is not a cursor issued by this endpoint.
         """
-        total = await AccountService.count(account_id)
-        if not total:
-            raise AccountNotFoundError
-        
-        # Ensure only authorized users can access the account:
-        # Managers have unrestricted access; non-managers can only access their own accounts.
-        if current_user.get("role", "") != Role.MANAGER:
-            user_account_id = await self.__get_user_id_by_account_id(account_id)
-            if user_account_id != int(current_user.get("user_id", "")):
-                raise ForbiddenAccountAccess
-        
-        query = transactions.select().where(transactions.c.account_id == account_id).limit(limit).offset(skip)
-
-        return await database.fetch_all(query)
-       
-    async def __update_account_balance(self, account_id: int, balance: float) -> None:
-        command = accounts.update().where(accounts.c.id == account_id).values(balance=balance)
-        await database.execute(command)
+        await self.check_account_access(account_id, current_user)
 
-    async def __register_transaction(self, transaction: TransactionIn) -> int:
-        command = transactions.insert().values(
-            account_id=transaction.account_id,
-            type=transaction.type,
-            amount=transaction.amount,
+        return await self.read_page(account_id, limit, after)
+
+    async def read_page(self, account_id: int, limit: int, after: str | None = None) -> dict:
+        """
+        Retrieves a page of transactions for a given account, ordered by (timestamp, id).
+
+        Pagination is keyset based: `after` is the opaque cursor returned as `next_cursor` by
+        the previous page, so every page is an index range scan on (account_id, timestamp, id)
+        no matter how deep it is. Access must be checked with `check_account_access` first.
+
+        Args:
+            account_id (int): The ID of the account whose transactions are to be retrieved.
+            limit (int): The maximum number of transactions to retrieve.
+            after (str | None): The cursor of the previous page, or None for the first page.
+
+        Returns:
+            dict: The page `items` and the `next_cursor`, which is None on the last page.
+
+        Raises:
+            InvalidCursorError: If `after` is not a cursor issued by this endpoint.
+        """
+        query = (
+            transactions.select()
+            .where(transactions.c.account_id == account_id)
+            .order_by(transactions.c.timestamp, transactions.c.id)
+            .limit(limit + 1)
         )
-        return await database.execute(command)
+        if after:
+            query = query.where(sa.tuple_(transactions.c.timestamp, transactions.c.id) > decode_cursor(after))
+
+        # One extra row tells whether there is a next page without a count query.
+        records = await database.fetch_all(query)
+        items = records[:limit]
+        next_cursor = encode_cursor(items[-1]) if len(records) > limit else None
+
+        return {"items": items, "next_cursor": next_cursor}
+       
+    async def check_account_access(self, account_id: int, current_user: dict[str, str]) -> Record:
+        """
+        Ensures the account exists and the current user may read it.
+
+        A single primary key lookup answers both questions. Managers have unrestricted access;
+        non-managers can only access their own accounts.
+
+        Args:
+            account_id (int): The ID of the account being accessed.
+            current_user (dict[str, str]): Information about the current user, including their role and ID.
+
+        Returns:
+            Record: The account's `id`, `user_id` and `version`, which changes with every new transaction.
 
-    async def __get_user_id_by_account_id(self, account_id: int) -> int:
-        query = accounts.select().where(accounts.c.id == account_id)
+        Raises:
+            AccountNotFoundError: If the account with the given ID does not exist.
+            ForbiddenAccountAccess: If the current user does not have permission to access the account.
+        """
+        query = sa.select(accounts.c.id, accounts.c.user_id, accounts.c.version).where(accounts.c.id == account_id)
         account = await database.fetch_one(query)
         if not account:
             raise AccountNotFoundError
 
-        return account.user_id
\ No newline at end of file
+        if current_user.get("role", "") != Role.MANAGER and account.user_id != int(current_user.get("user_id", "")):
+            raise ForbiddenAccountAccess
+
+        return account
+
+    async def export_by_account_id(self, account_id: int, format: ExportFormat) -> AsyncIterator[bytes]:
+        """
+        Streams the full history of an account as CSV or NDJSON.
+
+        Rows are read in keyset-ordered chunks of `settings.export_chunk_size` over one connection
+        and each chunk is encoded and yielded before the next one is fetched, so memory stays flat
+        whatever the size of the history. Access must be checked with `check_account_access` first.
+
+        Args:
+            account_id (int): The ID of the account to export.
+            format (ExportFormat): The output format.
+
+        Yields:
+            bytes: Encoded chunks of the statement.
+        """
+        columns = (transactions.c.id, transactions.c.type, transactions.c.amount, transactions.c.timestamp)
+        query = (
+            sa.select(*columns)
+            .where(transactions.c.account_id == account_id)
+            .order_by(transactions.c.timestamp, transactions.c.id)
+            .limit(settings.export_chunk_size)
+        )
+
+        if format == ExportFormat.CSV:
+            yield b"id,account_id,type,amount,timestamp\r\n"
+
+        async with database.connection():
+            page = query
+            while True:
+                records = await database.fetch_all(page)
+                if not records:
+                    break
+
+                yield _encode_export_chunk(account_id, records, format)
+
+                if len(records) < settings.export_chunk_size:
+                    break
+                page = query.where(sa.tuple_(transactions.c.timestamp, transactions.c.id) > (records[-1].timestamp, records[-1].id))
+
+    async def __apply_in_order(self, chunk: list[TransactionIn]) -> tuple[list[Record | Exception], list[tuple[Record, float]]]:
+        account_ids = sorted({transaction.account_id for transaction in chunk})
+
+        query = (
+            sa.select(accounts.c.id, accounts.c.balance)
+            .where(accounts.c.id.in_(account_ids))
+            .order_by(accounts.c.id)
+            .with_for_update()
+        )
+        # Decimal keeps the running balance exact, like the NUMERIC arithmetic of the single-item guard.
+        balances = {account.id: Decimal(str(account.balance)) for account in await database.fetch_all(query)}
+
+        outcomes: list[Record | Exception | None] = []
+        deltas: dict[int, Decimal] = {}
+        entries = []
+        balances_after = []
+        for transaction in chunk:
+            if transaction.account_id not in balances:
+                outcomes.append(AccountNotFoundError("Account not found"))
+                continue
+
+            if transaction.type == TransactionType.WITHDRAWAL:
+                delta = -Decimal(str(transaction.amount))
+            else:
+                delta = Decimal(str(transaction.amount))
+
+            if balances[transaction.account_id] + delta < 0:
+                outcomes.append(BusinessError("Operation not carried out due to lack of balance"))
+                continue
+
+            balances[transaction.account_id] += delta
+            deltas[transaction.account_id] = deltas.get(transaction.account_id, 0) + delta
+            entries.append(transaction.model_dump())
+            balances_after.append(float(balances[transaction.account_id]))
+            outcomes.append(None)
+
+        if entries:
+            command = (
+                accounts.update()
+                .where(accounts.c.id.in_(deltas))
+                # Deltas are cast explicitly: Postgres cannot infer the type of bare CASE parameters.
+                .values(
+                    balance=accounts.c.balance + sa.case(
+                        {id: sa.cast(delta, accounts.c.balance.type) for id, delta in deltas.items()},
+                        value=accounts.c.id,
+                    ),
+                    version=accounts.c.version + 1,
+                )
+            )
+            await database.execute(command)
+
+            # RETURNING gives no order guarantee; ids are assigned in VALUES order.
+            command = transactions.insert().values(entries).returning(transactions)
+            records = sorted(await database.fetch_all(command), key=lambda record: record.id)
+            created = iter(records)
+            outcomes = [next(created) if outcome is None else outcome for outcome in outcomes]
+            return outcomes, list(zip(records, balances_after))
+
+        return outcomes, []
+
+    async def __apply_coalesced(self, group: list[TransactionIn]) -> list[Record | Exception]:
+        async with account_locks.hold(group[0].account_id):
+            outcomes, entries = await writer.run(lambda: self.__apply_in_order(group))
+            await writer.after_commit(account_cache.invalidate, group[0].account_id)
+            await writer.after_commit(_publish, entries)
+
+        return outcomes
+
+    async def __apply(self, transaction: TransactionIn, delta: float) -> tuple[Record, float]:
+        account = await self.__update_account_balance(transaction.account_id, delta)
+        if not account:
+            # The conditional update matched no row: tell a missing account apart from
+            # an overdraft. This extra query only runs on the failure path.
+            total = await AccountService.count(transaction.account_id)
+            if not total:
+                raise AccountNotFoundError
+            raise BusinessError
+
+        # Create transaction entry
+        return await self.__register_transaction(transaction), float(account.balance)
+
+    async def __apply_transfer(self, transfer: TransferIn, deltas: dict[int, float]) -> tuple[dict[TransactionType, Record], dict[int, float]]:
+        balances = {}
+        for account_id in sorted(deltas):
+            account = await self.__update_account_balance(account_id, deltas[account_id])
+            if not account:
+                total = await AccountService.count(account_id)
+                if not total:
+                    raise AccountNotFoundError
+                raise BusinessError
+            balances[account_id] = float(account.balance)
+
+        command = transactions.insert().values([
+            {"account_id": transfer.source_account_id, "type": TransactionType.TRANSFER_OUT, "amount": transfer.amount},
+            {"account_id": transfer.destination_account_id, "type": TransactionType.TRANSFER_IN, "amount": transfer.amount},
+        ]).returning(transactions)
+        return {leg.type: leg for leg in await database.fetch_all(command)}, balances
+
+    async def __update_account_balance(self, account_id: int, delta: float) -> Record | None:
+        # The guard keeps the balance from going negative; for a withdrawal it reads as
+        # "balance >= amount". No row is returned when the guard (or the id) does not match.
+        command = (
+            accounts.update()
+            .where(accounts.c.id == account_id, accounts.c.balance + delta >= 0)
+            .values(balance=accounts.c.balance + delta, version=accounts.c.version + 1)
+            .returning(accounts.c.id, accounts.c.balance)
+        )
+        return await database.fetch_one(command)
+
+    async def __register_transaction(self, transaction: TransactionIn) -> Record:
+        command = transactions.insert().values(
+            account_id=transaction.account_id,
+            type=transaction.type,
+            amount=transaction.amount,
+        ).returning(transactions)
+        return await database.fetch_one(command)
@@ -1,10 +1,76 @@
+import csv
+import json
+from collections.abc import AsyncIterable, AsyncIterator
+
 from databases.interfaces import Record
+from pydantic import ValidationError
+from sqlalchemy.dialects import postgresql, sqlite
 
+from src.cache import MemoryBackend, ReadThroughCache
+from src.config import settings
 from src.exceptions import UserNotFoundError, ForbiddenAccountAccess
-from src.database import database
+from src.database import database, database_url
 from src.models.user import users
-from src.schemas.user import UserIn, UserUpdateIn, Role
-from src.security.auth import hash_password
+from src.schemas.user import ImportFormat, UserIn, UserUpdateIn, Role
+from src.security.auth import hash_password_async, hash_passwords_parallel
+from src.services.revocation import revocations
+from src.writer import writer
+
+user_cache = ReadThroughCache("users", MemoryBackend(settings.read_cache_size), ttl=settings.read_cache_ttl_seconds)
+
+
+async def _split_lines(content: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Yields the lines of `content` as its chunks arrive, holding at most one partial line."""
+    pending = b""
+    async for chunk in content:
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
+
+async def _parse_user_rows(content: AsyncIterable[bytes], format: ImportFormat) -> AsyncIterator[tuple[int, UserIn | None, str | None]]:
+    """Yields (row number, user, error) for each non-blank data row; exactly one of user and error is set."""
+    fieldnames = None
+    number = 0
+    async for line in _split_lines(content):
+        if not line.strip():
+            continue
+        if format == ImportFormat.CSV and fieldnames is None:
+            fieldnames = next(csv.reader([line.decode(errors="replace")]))
+            continue
+
+        number += 1
+        try:
+            # Lines are decoded one at a time, so an invalid byte only rejects its own row.
+            text = line.decode()
+            if format == ImportFormat.CSV:
+                row = dict(zip(fieldnames, next(csv.reader([text]))))
+            else:
+                row = json.loads(text)
+            yield number, UserIn.model_validate(row), None
+        except ValueError as error:
+            if isinstance(error, ValidationError):
+                message = "; ".join(f"{'.'.join(map(str, detail['loc']))}: {detail['msg']}" for detail in error.errors())
+            elif isinstance(error, UnicodeDecodeError):
+                message = f"invalid UTF-8: {error}"
+            else:
+                message = f"invalid JSON: {error}"
+            yield number, None, message
+
+
+async def _take(rows: AsyncIterator, size: int) -> list:
+    chunk = []
+    while len(chunk) < size and (row := await anext(rows, None)) is not None:
+        chunk.append(row)
+    return chunk
+
+
+def _insert_new_users(rows: list[dict]):
+    # Skips rows whose cpf was registered concurrently; RETURNING tells which ones were inserted.
+    dialect = postgresql if database_url.dialect == "postgresql" else sqlite
+    return dialect.insert(users).values(rows).on_conflict_do_nothing(index_elements=[users.c.cpf]).returning(users.c.cpf)
 
 
 class UserService:
@@ -20,10 +86,38 @@ class UserService:
         command = users.insert().values(
             name = user.name,
             cpf = user.cpf,
-            password = hash_password(user.password),
+            password = await hash_password_async(user.password),
             role_id = Role.CLIENT,
         )
-        return await database.execute(command)
+        return await writer.run(lambda: database.execute(command))
+
+    def import_users(self, content: AsyncIterable[bytes], format: ImportFormat, current_user: dict[str, str]) -> AsyncIterator[dict]:
+        """
+        Creates clients in bulk from CSV (with a name,cpf,password header) or NDJSON lines of `UserIn`.
+
+        The input is split into lines as it arrives and rows are imported in chunks of
+        `settings.user_import_chunk_size`: the chunk's passwords are hashed across the password
+        process pool, one process per core, and its users are written with one multi-row INSERT.
+        Invalid rows (including lines that are not valid UTF-8) and rows whose cpf is already
+        registered, or repeated earlier in the import, are reported and skipped instead of
+        aborting the import.
+
+        Args:
+            content (AsyncIterable[bytes]): The UTF-8 input, in chunks of any size.
+            format (ImportFormat): Whether the lines are CSV or NDJSON.
+            current_user (dict[str, str]): Information about the current user, including their role.
+
+        Returns:
+            AsyncIterator[dict]: One event per rejected row (`row`, `cpf`, `error`) and, after each
+            chunk, a `progress` event with the `processed`, `created` and `rejected` totals so far.
+
+        Raises:
+            ForbiddenAccountAccess: If the current user is not a manager; raised before any row is read.
+        """
+        if current_user.get("role", "") != Role.MANAGER:
+            raise ForbiddenAccountAccess
+
+        return self.__import(content, format)
 
     async def read(self, id: int, current_user: dict[str, str]) -> Record:
         if current_user.get("role", "") != Role.MANAGER:
@@ -31,33 +125,87 @@ class UserService:
         
         return await self.__get_by_id(id)
     
-    async def read_me(self, id: int) -> Record:
-        return await self.__get_by_id(id)
+    async def read_me(self, id: int) -> dict:
+        user = await user_cache.get(id, lambda: self.__load(id))
+        if not user:
+            raise UserNotFoundError
+
+        return user
 
     async def update(self, id: int, user: UserUpdateIn, current_user: dict[str, str]) -> Record:
         if current_user.get("role", "") != Role.MANAGER:
             raise ForbiddenAccountAccess
         
-        total = await self.count(id)
-        if not total:
-            raise UserNotFoundError
-
         data = user.model_dump(exclude_unset=True)
 
         if data.get("password"):
-            data["password"] = hash_password(data["password"])
+            data["password"] = await hash_password_async(data["password"])
             
-        command = users.update().where(users.c.id == id).values(**data)
-        await database.execute(command)
+        command = users.update().where(users.c.id == id).values(**data).returning(users)
+        updated = await writer.run(lambda: database.fetch_one(command))
+        await writer.after_commit(user_cache.invalidate, id)
+        if not updated:
+            raise UserNotFoundError
 
-        return await self.__get_by_id(id)
+        if "role_id" in data:
+            # Tokens carry the role; the old one must stop working now, not when they expire.
+            await revocations.revoke_subject(str(id))
+
+        return updated
 
     async def delete(self, id: int, current_user: dict[str, str]) -> None:
         if current_user.get("role", "") != Role.MANAGER:
             raise ForbiddenAccountAccess
         
         command = users.delete().where(users.c.id == id)
-        await database.execute(command)
+        await writer.run(lambda: database.execute(command))
+        await writer.after_commit(user_cache.invalidate, id)
+        await revocations.revoke_subject(str(id))
+
+    async def __import(self, content: AsyncIterable[bytes], format: ImportFormat) -> AsyncIterator[dict]:
+        totals = {"processed": 0, "created": 0, "rejected": 0}
+        seen: set[str] = set()
+        rows = _parse_user_rows(content, format)
+        while chunk := await _take(rows, settings.user_import_chunk_size):
+            rejected = []
+            candidates: dict[str, tuple[int, UserIn]] = {}
+            for number, user, error in chunk:
+                if error:
+                    rejected.append({"row": number, "cpf": None, "error": error})
+                elif user.cpf in seen:
+                    rejected.append({"row": number, "cpf": user.cpf, "error": "cpf repeated in this import"})
+                else:
+                    seen.add(user.cpf)
+                    candidates[user.cpf] = (number, user)
+
+            # Registered cpfs are rejected before hashing, which is where the time goes.
+            if candidates:
+                query = users.select().with_only_columns(users.c.cpf).where(users.c.cpf.in_(candidates))
+                for record in await database.fetch_all(query):
+                    number, _ = candidates.pop(record.cpf)
+                    rejected.append({"row": number, "cpf": record.cpf, "error": "cpf already registered"})
+
+            created = 0
+            if candidates:
+                new_users = [user for _, user in candidates.values()]
+                hashes = await hash_passwords_parallel([user.password for user in new_users])
+                values = [
+                    {"name": user.name, "cpf": user.cpf, "password": password, "role_id": Role.CLIENT}
+                    for user, password in zip(new_users, hashes)
+                ]
+                inserted = {record.cpf for record in await writer.run(lambda: database.fetch_all(_insert_new_users(values)))}
+                created = len(inserted)
+                for cpf, (number, _) in candidates.items():
+                    if cpf not in inserted:
+                        rejected.append({"row": number, "cpf": cpf, "error": "cpf already registered"})
+
+            for event in sorted(rejected, key=lambda event: event["row"]):
+                yield event
+
+            totals["processed"] += len(chunk)
+            totals["created"] += created
+            totals["rejected"] += len(rejected)
+            yield {"progress": dict(totals)}
 
     @staticmethod
     async def count(id: int) -> int:
@@ -66,6 +214,10 @@ class UserService:
 
         return result.total
 
+    async def __load(self, id: int) -> dict | None:
+        user = await database.fetch_one(users.select().where(users.c.id == id))
+        return dict(user._mapping) if user else None
+
     async def __get_by_id(self, id: int) -> Record:
         query = users.select().where(users.c.id == id)
         user = await database.fetch_one(query)
@@ -1,12 +1,36 @@
 from datetime import datetime
-from pydantic import BaseModel, PositiveFloat
+from typing import Iterable
+
+from databases.interfaces import Record
+from pydantic import BaseModel, NonNegativeFloat, TypeAdapter
+from typing_extensions import TypedDict
+
+from src.database import row_values
 
 
 class AccountCreatedOut(BaseModel):
     id: int
     user_id: int
-    balance: PositiveFloat
+    balance: NonNegativeFloat
 
 
 class AccountOut(AccountCreatedOut):
     created_at: datetime
+
+
+class _AccountRow(TypedDict):
+    id: int
+    user_id: int
+    balance: float
+    created_at: datetime
+
+
+_account_list = TypeAdapter(list[_AccountRow])
+
+
+def account_list_json(records: Iterable[Record]) -> bytes:
+    """Encodes `accounts` rows as a JSON list of `AccountOut`, without validating them again."""
+    return _account_list.dump_json([
+        {"id": id, "user_id": user_id, "balance": float(balance), "created_at": created_at}
+        for id, user_id, balance, created_at in row_values(records, "id", "user_id", "balance", "created_at")
+    ])
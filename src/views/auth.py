@@ -2,4 +2,5 @@ from pydantic import BaseModel
 
 
 class LoginOut(BaseModel):
-    access_token: str
\ No newline at end of file
+    access_token: str
+    refresh_token: str
\ No newline at end of file
@@ -1,5 +1,11 @@
 from datetime import datetime
-from pydantic import BaseModel, PositiveFloat
+from typing import Iterable
+
+from databases.interfaces import Record
+from pydantic import BaseModel, PositiveFloat, TypeAdapter
+from typing_extensions import TypedDict
+
+from src.database import row_values
 
 
 class TransactionCreatedOut(BaseModel):
@@ -10,4 +16,49 @@ class TransactionCreatedOut(BaseModel):
 
 
 class TransactionOut(TransactionCreatedOut):
-    timestamp: datetime
\ No newline at end of file
+    timestamp: datetime
+
+
+class TransactionPageOut(BaseModel):
+    items: list[TransactionOut]
+    next_cursor: str | None
+
+
+class TransferOut(BaseModel):
+    debit: TransactionOut
+    credit: TransactionOut
+
+
+class TransactionBatchItemOut(BaseModel):
+    id: int | None = None
+    account_id: int
+    type: str
+    amount: PositiveFloat
+    timestamp: datetime | None = None
+    success: bool
+    detail: str | None = None
+
+
+class _TransactionRow(TypedDict):
+    id: int
+    account_id: int
+    type: str
+    amount: float
+    timestamp: datetime
+
+
+class _TransactionPage(TypedDict):
+    items: list[_TransactionRow]
+    next_cursor: str | None
+
+
+_transaction_page = TypeAdapter(_TransactionPage)
+
+
+def transaction_page_json(records: Iterable[Record], next_cursor: str | None) -> bytes:
+    """Encodes `transactions` rows as a `TransactionPageOut`, without validating them again."""
+    items = [
+        {"id": id, "account_id": account_id, "type": getattr(type, "value", type), "amount": float(amount), "timestamp": timestamp}
+        for id, account_id, type, amount, timestamp in row_values(records, "id", "account_id", "type", "amount", "timestamp")
+    ]
+    return _transaction_page.dump_json({"items": items, "next_cursor": next_cursor})
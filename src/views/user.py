@@ -1,4 +1,10 @@
-from pydantic import BaseModel
+from typing import Iterable
+
+from databases.interfaces import Record
+from pydantic import BaseModel, TypeAdapter
+from typing_extensions import TypedDict
+
+from src.database import row_values
 
 
 class UserCreatedOut(BaseModel):
@@ -11,4 +17,22 @@ class UserCreatedOut(BaseModel):
 
 
 class UserOut(UserCreatedOut):
-    role_id: str
\ No newline at end of file
+    role_id: str
+
+
+class _UserRow(TypedDict):
+    id: int
+    name: str
+    cpf: str
+    role_id: str
+
+
+_user_list = TypeAdapter(list[_UserRow])
+
+
+def user_list_json(records: Iterable[Record]) -> bytes:
+    """Encodes `users` rows as a JSON list of `UserOut`, without validating them again."""
+    return _user_list.dump_json([
+        {"id": id, "name": name, "cpf": cpf, "role_id": getattr(role_id, "value", role_id)}
+        for id, name, cpf, role_id in row_values(records, "id", "name", "cpf", "role_id")
+    ])
@@ -0,0 +1,204 @@
+"""
+Single-writer queue for SQLite.
+
+SQLite allows one writer at a time, so concurrent requests writing through their own
+connections pile up on the database lock ("database is locked"). In single-writer mode every
+write is handed to one writer task instead: it takes whatever jobs are queued, runs each in its
+own SAVEPOINT inside one transaction and commits them together. Readers keep their own
+connections and, with WAL, run concurrently with the writer.
+
+On other backends, or with `settings.sqlite_single_writer` off, `writer.run` simply runs the
+operation in a transaction of the caller's connection.
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, NamedTuple, TypeVar
+
+from src.config import settings
+from src.database import QueryStats, database, database_url, query_stats
+from src.metrics import GaugeCallback, Histogram, registry
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+db_writer_batch_size = registry.register(
+    Histogram("db_writer_batch_size", "Jobs committed together by the SQLite writer.", buckets=(1, 2, 5, 10, 25, 50, 100, 250))
+)
+
+Callback = Callable[[], Awaitable[Any]]
+
+# The `after_commit` callbacks of the operation running in a writer transaction; None outside one.
+_after_commit: contextvars.ContextVar[list[Callback] | None] = contextvars.ContextVar("writer_after_commit", default=None)
+
+
+class _Job(NamedTuple):
+    operation: Callable[[], Awaitable[Any]]
+    future: asyncio.Future
+    stats: QueryStats | None
+
+
+async def _run_callbacks(callbacks: list[Callback]) -> None:
+    for callback in callbacks:
+        try:
+            await callback()
+        except Exception:
+            logger.exception("After-commit callback failed")
+
+
+class Writer:
+    def __init__(self, enabled: bool, batch_size: int):
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self._queue: deque[_Job] = deque()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    @property
+    def in_transaction(self) -> bool:
+        """Whether the caller runs inside an operation passed to `run`, whose transaction is still open."""
+        return _after_commit.get() is not None
+
+    async def after_commit(self, callback: Callable[..., Awaitable[Any]], *args: Any) -> None:
+        """
+        Runs `callback(*args)` once the caller's writes are committed.
+
+        Outside an operation passed to `run` that is right away. Inside one, the callback waits for
+        the outermost transaction: a nested `run` only releases a SAVEPOINT, after which its writes
+        can still be rolled back and, in single-writer mode, the rest of the batch still has to run.
+        The callbacks of an operation that fails are dropped.
+
+        Args:
+            callback (Callable[..., Awaitable[Any]]): Called with `args`, e.g. to invalidate cached rows.
+            *args (Any): The arguments, bound now rather than when `callback` runs.
+        """
+        callbacks = _after_commit.get()
+        if callbacks is None:
+            await callback(*args)
+        else:
+            callbacks.append(functools.partial(callback, *args))
+
+    async def run(self, operation: Callable[[], Awaitable[T]]) -> T:
+        """
+        Runs `operation` in a DB transaction, through the writer task in single-writer mode.
+
+        Args:
+            operation (Callable[[], Awaitable[T]]): Performs the writes; called with no arguments.
+
+        Returns:
+            T: Whatever `operation` returns, once its transaction has been committed.
+
+        Raises:
+            Exception: Whatever `operation` raised; its writes are rolled back.
+        """
+        if not self.enabled or asyncio.current_task() is self._task:
+            # Nested calls from a job run inline, in a SAVEPOINT of the current batch.
+            outer = _after_commit.get()
+            callbacks: list[Callback] = []
+            token = _after_commit.set(callbacks)
+            try:
+                async with database.transaction():
+                    result = await operation()
+            finally:
+                _after_commit.reset(token)
+
+            if outer is None:
+                await _run_callbacks(callbacks)
+            else:
+                # Only a SAVEPOINT was released: they wait for the enclosing transaction.
+                outer.extend(callbacks)
+            return result
+
+        loop = asyncio.get_running_loop()
+        if self._task is not None and self._task.get_loop() is not loop:
+            # Left behind by an event loop that was closed mid-batch, e.g. between tests.
+            self._queue.clear()
+            self._task = None
+
+        future = loop.create_future()
+        self._queue.append(_Job(operation, future, query_stats.get()))
+        if self._task is None:
+            # The writer exits once the queue is drained, so it is (re)started on demand and
+            # never outlives the event loop that needs it. It gets an empty context: statements
+            # are attributed to each job's own request instead.
+            self._task = asyncio.create_task(self.__drain(), context=contextvars.Context())
+        return await future
+
+    async def __drain(self) -> None:
+        try:
+            while self._queue:
+                # Let requests that are about to write join this batch.
+                await asyncio.sleep(0)
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                await self.__commit(batch)
+        except BaseException as error:
+            self.__fail(self._queue, error)
+            self._queue.clear()
+            raise
+        finally:
+            self._task = None
+
+    async def __commit(self, batch: list[_Job]) -> None:
+        # Callers are only resumed once the batch transaction is over, so by then the writer's
+        # connection has been released even if the event loop stops right after them.
+        outcomes: list[tuple[_Job, Any, Exception | None, list[Callback]]] = []
+        try:
+            async with database.transaction():
+                for job in batch:
+                    if job.future.done():
+                        # The caller went away before its job started.
+                        continue
+                    token = query_stats.set(job.stats)
+                    callbacks: list[Callback] = []
+                    after_commit = _after_commit.set(callbacks)
+                    try:
+                        async with database.transaction():
+                            result = await job.operation()
+                    except Exception as error:
+                        outcomes.append((job, None, error, []))
+                    else:
+                        outcomes.append((job, result, None, callbacks))
+                    finally:
+                        _after_commit.reset(after_commit)
+                        query_stats.reset(token)
+        except Exception as error:
+            logger.exception("SQLite writer failed to commit a batch of %d jobs", len(batch))
+            self.__fail(batch, error)
+            return
+        except BaseException as error:
+            self.__fail(batch, error)
+            raise
+
+        db_writer_batch_size.observe(len(outcomes))
+        # Before callers resume, so e.g. invalidated cache entries are gone once they see their result.
+        for _, _, _, callbacks in outcomes:
+            await _run_callbacks(callbacks)
+        for job, result, error, _ in outcomes:
+            if job.future.done():
+                continue
+            if error is not None:
+                job.future.set_exception(error)
+            else:
+                job.future.set_result(result)
+
+    @staticmethod
+    def __fail(jobs, error: BaseException) -> None:
+        if not isinstance(error, Exception):
+            error = RuntimeError("SQLite writer stopped")
+        for job in jobs:
+            if not job.future.done():
+                job.future.set_exception(error)
+
+
+writer = Writer(
+    enabled=database_url.dialect == "sqlite" and settings.sqlite_single_writer,
+    batch_size=settings.sqlite_writer_batch_size,
+)
+
+registry.register(GaugeCallback("db_writer_queued", "Writes waiting for the SQLite writer.", lambda: {(): writer.queued}))
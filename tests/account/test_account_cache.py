@@ -0,0 +1,189 @@
+import asyncio
+
+import pytest_asyncio
+from fastapi import status
+from httpx import AsyncClient
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def populate_posts(db):
+    from src.schemas.account import AccountIn
+    from src.services.account import AccountService
+    from src.schemas.user import UserIn
+    from src.services.user import UserService
+
+    user_service = UserService()
+    await user_service.create(UserIn(name="José da Silva", cpf="12345678910", password="test1234"))
+
+    acc_service = AccountService()
+    await acc_service.create(AccountIn(user_id="1", balance=10))
+    await acc_service.create(AccountIn(user_id="1", balance=100))
+
+
+async def read_balance(client: AsyncClient, headers: dict[str, str], account_id: int = 1) -> float:
+    response = await client.get(f"/accounts/{account_id}", headers=headers)
+    return response.json()["balance"]
+
+
+async def test_account_cache_hit(client: AsyncClient, access_token_manager: str, query_counter):
+    # Given
+    from src.services.account import account_cache
+
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    await client.get("/accounts/1", headers=headers)
+    query_counter.reset()
+
+    # When
+    response = await client.get("/accounts/1", headers=headers)
+
+    # Then
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["balance"] == 10
+    assert query_counter.count == 0
+    assert (account_cache.hits, account_cache.misses) == (1, 1)
+
+
+async def test_account_cache_never_serves_stale_balance(client: AsyncClient, access_token_manager: str, monkeypatch):
+    # Given
+    from src.services.transaction import coalescer
+
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    deposit = {"account_id": 1, "type": "DEPOSIT", "amount": 5}
+    transfer = {"source_account_id": 2, "destination_account_id": 1, "amount": 10}
+    balances = [await read_balance(client, headers)]
+
+    # When
+    await client.post("/transactions/", json=deposit, headers=headers)
+    balances.append(await read_balance(client, headers))
+
+    await client.post("/transactions/transfer", json=transfer, headers=headers)
+    balances.append(await read_balance(client, headers))
+
+    await client.post("/transactions/batch", json=[deposit, deposit], headers=headers)
+    balances.append(await read_balance(client, headers))
+
+    monkeypatch.setattr(coalescer, "enabled", True)
+    await client.post("/transactions/", json=deposit, headers=headers)
+    balances.append(await read_balance(client, headers))
+
+    # Then
+    assert balances == [10, 15, 25, 35, 40]
+    assert await read_balance(client, headers, account_id=2) == 90
+
+
+async def test_account_cache_invalidated_after_idempotent_transaction_commits(client: AsyncClient, access_token_manager: str, monkeypatch):
+    # Given
+    import contextvars
+
+    from src.controllers.transaction import idempotency_service
+    from src.services.account import AccountService, account_cache
+
+    idempotency_service.clear()
+    headers = {"Authorization": f"Bearer {access_token_manager}", "Idempotency-Key": "deposit-1"}
+    deposit = {"account_id": 1, "type": "DEPOSIT", "amount": 5}
+    invalidate = account_cache.invalidate
+
+    async def invalidate_then_read(*keys):
+        await invalidate(*keys)
+        # A concurrent request, on its own connection, reads the account right after the invalidation.
+        await asyncio.create_task(AccountService().read(1), context=contextvars.Context())
+
+    monkeypatch.setattr(account_cache, "invalidate", invalidate_then_read)
+
+    # When
+    await client.post("/transactions/", json=deposit, headers=headers)
+    monkeypatch.undo()
+
+    # Then
+    assert await read_balance(client, headers) == 15
+
+
+async def test_account_cache_invalidated_on_delete(client: AsyncClient, access_token_manager: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    await client.get("/accounts/1", headers=headers)
+
+    # When
+    await client.delete("/accounts/1", headers=headers)
+    response = await client.get("/accounts/1", headers=headers)
+
+    # Then
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+async def test_account_cache_invalidated_on_update():
+    # Given
+    from src.schemas.account import AccountIn
+    from src.services.account import AccountService
+
+    service = AccountService()
+    await service.read(1)
+
+    # When
+    await service.update(1, AccountIn(user_id="1", balance=50))
+    account = await service.read(1)
+
+    # Then
+    assert account["balance"] == 50
+
+
+async def test_read_cache_load_racing_invalidation_not_stored():
+    # Given
+    from src.cache import MemoryBackend, ReadThroughCache, caches
+
+    cache = ReadThroughCache("race", MemoryBackend(10), ttl=60)
+    loaded = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_load():
+        loaded.set()
+        await release.wait()
+        return {"balance": 10}
+
+    # When
+    reader = asyncio.create_task(cache.get(1, slow_load))
+    await loaded.wait()
+    await cache.invalidate(1)
+    release.set()
+    value = await reader
+
+    # Then
+    assert value == {"balance": 10}
+    assert await cache.backend.get("race:1") is None
+    del caches["race"]
+
+
+async def test_read_cache_evicts_least_recently_used_and_expires(mocker):
+    # Given
+    from src.cache import MemoryBackend
+
+    backend = MemoryBackend(maxsize=2)
+    await backend.set("a", 1, ttl=60)
+    await backend.set("b", 2, ttl=60)
+    await backend.get("a")
+
+    # When
+    await backend.set("c", 3, ttl=60)
+    mocker.patch("src.cache.time.monotonic", return_value=float("inf"))
+
+    # Then
+    assert backend.evictions == 1
+    assert "b" not in backend._entries
+    assert await backend.get("a") is None
+
+
+async def test_read_cache_metrics(client: AsyncClient, access_token_manager: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    await client.get("/accounts/1", headers=headers)
+    await client.get("/accounts/1", headers=headers)
+
+    # When
+    response = await client.get("/metrics")
+
+    # Then
+    content = response.text
+
+    assert 'read_cache_hits_total{cache="accounts"} 1' in content
+    assert 'read_cache_misses_total{cache="accounts"} 1' in content
+    assert 'read_cache_evictions_total{cache="accounts"} 0' in content
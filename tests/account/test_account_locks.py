@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest_asyncio
+from fastapi import status
+from httpx import AsyncClient
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def populate_posts(db, monkeypatch):
+    from src.schemas.account import AccountIn
+    from src.services.account import AccountService
+    from src.schemas.user import UserIn
+    from src.services.user import UserService
+    from src.locks import account_locks
+
+    monkeypatch.setattr(account_locks, "enabled", True)
+
+    user_service = UserService()
+    await user_service.create(UserIn(name="José da Silva", cpf="12345678910", password="test1234"))
+
+    acc_service = AccountService()
+    await acc_service.create(AccountIn(user_id="1", balance=100))
+    await acc_service.create(AccountIn(user_id="1", balance=100))
+
+
+async def test_account_lock_serializes_same_account():
+    # Given
+    from src.locks import account_locks
+
+    events = []
+
+    async def mutate(name: str):
+        async with account_locks.hold(1):
+            events.append(f"{name} start")
+            await asyncio.sleep(0.01)
+            events.append(f"{name} end")
+
+    # When
+    first = asyncio.create_task(mutate("first"))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(mutate("second"))
+    await asyncio.sleep(0)
+    waiters = account_locks.waiters[account_locks.stripe(1)]
+    await asyncio.gather(first, second)
+
+    # Then
+    assert waiters == 1
+    assert events == ["first start", "first end", "second start", "second end"]
+    assert account_locks.wait_seconds[account_locks.stripe(1)] > 0
+
+
+async def test_account_lock_other_accounts_not_blocked():
+    # Given
+    from src.locks import account_locks
+
+    async def mutate_other_account():
+        async with account_locks.hold(2):
+            return True
+
+    # When
+    async with account_locks.hold(1):
+        done = await asyncio.wait_for(mutate_other_account(), timeout=1)
+
+    # Then
+    assert done
+    assert account_locks.waiters[account_locks.stripe(2)] == 0
+
+
+async def test_account_lock_opposite_transfers_no_deadlock(client: AsyncClient, access_token_manager: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    forward = {"source_account_id": 1, "destination_account_id": 2, "amount": 1}
+    backward = {"source_account_id": 2, "destination_account_id": 1, "amount": 1}
+
+    # When
+    responses = await asyncio.wait_for(
+        asyncio.gather(*[client.post("/transactions/transfer", json=data, headers=headers) for data in [forward, backward] * 10]),
+        timeout=10,
+    )
+
+    # Then
+    account_1 = (await client.get("/accounts/1", headers=headers)).json()
+
+    assert all(response.status_code == status.HTTP_201_CREATED for response in responses)
+    assert account_1["balance"] == 100
+
+
+async def test_account_lock_metrics(client: AsyncClient, access_token_manager: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    data = {"account_id": 1, "type": "DEPOSIT", "amount": 1}
+    await asyncio.gather(*[client.post("/transactions/", json=data, headers=headers) for _ in range(5)])
+
+    # When
+    response = await client.get("/metrics")
+
+    # Then
+    assert "account_lock_wait_seconds_count" in response.text
+    assert "# TYPE account_lock_contended_seconds_total counter" in response.text
+
+
+async def test_account_lock_mixed_idempotent_requests_small_pool(client: AsyncClient, access_token_manager: str, monkeypatch):
+    # Given
+    from src.controllers.transaction import idempotency_service
+    from src.database import database
+    from src.writer import writer
+
+    idempotency_service.clear()
+    monkeypatch.setattr(writer, "enabled", False)
+    monkeypatch.setattr(database.limiter, "_semaphore", asyncio.Semaphore(2))
+    monkeypatch.setattr(database.limiter, "timeout", 2)
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    data = {"account_id": 1, "type": "DEPOSIT", "amount": 1}
+
+    # When
+    responses = await asyncio.wait_for(
+        asyncio.gather(*[
+            client.post("/transactions/", json=data, headers={**headers, "Idempotency-Key": f"deposit-{i}"} if i % 2 else headers)
+            for i in range(10)
+        ]),
+        timeout=10,
+    )
+
+    # Then
+    account_1 = (await client.get("/accounts/1", headers=headers)).json()
+
+    assert all(response.status_code == status.HTTP_201_CREATED for response in responses)
+    assert account_1["balance"] == 110
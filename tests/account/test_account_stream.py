@@ -0,0 +1,172 @@
+import json
+
+import pytest
+import pytest_asyncio
+from fastapi import status
+from httpx import AsyncClient
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def populate_posts(db):
+    from src.schemas.account import AccountIn
+    from src.services.account import AccountService
+    from src.schemas.user import UserIn
+    from src.services.user import UserService
+
+    user_service = UserService()
+    await user_service.create(UserIn(name="José da Silva", cpf="12345678910", password="test1234"))
+    await user_service.create(UserIn(name="Maria dos Santos", cpf="12345678911", password="test1234"))
+
+    acc_service = AccountService()
+    await acc_service.create(AccountIn(user_id=1, balance=10))
+    await acc_service.create(AccountIn(user_id=2, balance=100))
+
+
+def parse(event: bytes) -> tuple[str, dict]:
+    name, data = event.decode().strip().split("\n")
+    return name.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+
+async def test_stream_account_pushes_committed_transactions():
+    # Given
+    from src.schemas.transaction import TransactionIn, TransferIn
+    from src.services.account import AccountService
+    from src.services.transaction import TransactionService
+
+    stream = AccountService().stream(1)
+    snapshot = await anext(stream)
+
+    # When
+    await TransactionService().create(TransactionIn(account_id=1, type="DEPOSIT", amount=5))
+    await TransactionService().transfer(TransferIn(source_account_id=2, destination_account_id=1, amount=20))
+    await TransactionService().create(TransactionIn(account_id=2, type="DEPOSIT", amount=1))
+    events = [parse(await anext(stream)) for _ in range(2)]
+    await stream.aclose()
+
+    # Then
+    assert parse(snapshot) == ("balance", {"balance": 10})
+    assert [(name, data["transaction"]["type"], data["balance"]) for name, data in events] == [
+        ("transaction", "DEPOSIT", 15),
+        ("transaction", "TRANSFER_IN", 35),
+    ]
+
+
+async def test_stream_account_skips_rolled_back_transactions():
+    # Given
+    from src.pubsub import account_events
+    from src.schemas.transaction import TransactionIn
+    from src.services.transaction import TransactionService
+    from src.writer import writer
+
+    subscription = account_events.subscribe(1)
+
+    async def operation():
+        # Like the idempotent path: the transaction is created inside an enclosing writer.run.
+        await TransactionService().create(TransactionIn(account_id=1, type="DEPOSIT", amount=5))
+        raise ValueError("boom")
+
+    # When
+    with pytest.raises(ValueError):
+        await writer.run(operation)
+    account_events.unsubscribe(subscription)
+
+    # Then
+    assert subscription.queue.empty()
+
+
+async def test_stream_account_drops_slow_subscriber(monkeypatch):
+    # Given
+    from src.pubsub import account_events
+    from src.schemas.transaction import TransactionIn
+    from src.services.account import AccountService
+    from src.services.transaction import TransactionService
+
+    monkeypatch.setattr(account_events, "queue_size", 2)
+    slow = AccountService().stream(1)
+    await anext(slow)
+
+    # When
+    await TransactionService().create_batch([TransactionIn(account_id=1, type="DEPOSIT", amount=1)] * 3)
+
+    # Then
+    assert parse(await anext(slow)) == ("dropped", {})
+    assert not account_events.has_subscribers(1)
+
+
+async def test_stream_account_keepalive(monkeypatch):
+    # Given
+    from src.config import settings
+    from src.pubsub import account_events
+    from src.services.account import AccountService
+
+    monkeypatch.setattr(settings, "stream_heartbeat_seconds", 0.01)
+    stream = AccountService().stream(1)
+    await anext(stream)
+
+    # When
+    event = await anext(stream)
+    await stream.aclose()
+
+    # Then
+    assert event == b": keepalive\n\n"
+    assert not account_events.has_subscribers(1)
+
+
+def access_token(ttl_seconds: float):
+    import time
+    from uuid import uuid4
+
+    from src.security.auth import AccessToken
+
+    now = time.time()
+    return AccessToken(
+        iss="desafio-bank.com.br", sub="1", rol="CLIENT", aud="desafio-bank",
+        exp=now + ttl_seconds, iat=now, nbf=now, jti=uuid4().hex,
+    )
+
+
+async def test_stream_account_ends_when_token_expires():
+    # Given
+    from src.pubsub import account_events
+    from src.services.account import AccountService
+
+    stream = AccountService().stream(1, access_token(ttl_seconds=0.05))
+    await anext(stream)
+
+    # When
+    events = [event async for event in stream if not event.startswith(b":")]
+
+    # Then
+    assert [parse(event) for event in events] == [("unauthorized", {})]
+    assert not account_events.has_subscribers(1)
+
+
+async def test_stream_account_ends_when_token_revoked():
+    # Given
+    from src.schemas.transaction import TransactionIn
+    from src.services.account import AccountService
+    from src.services.revocation import revocations
+    from src.services.transaction import TransactionService
+
+    token = access_token(ttl_seconds=60)
+    stream = AccountService().stream(1, token)
+    await anext(stream)
+
+    # When
+    await revocations.revoke(token.jti, token.exp)
+    await TransactionService().create(TransactionIn(account_id=1, type="DEPOSIT", amount=5))
+    events = [event async for event in stream]
+
+    # Then
+    assert [parse(event) for event in events] == [("unauthorized", {})]
+
+
+async def test_stream_account_forbidden(client: AsyncClient, access_token_client: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_client}"}
+
+    # When
+    response = await client.get("/accounts/2/stream", headers=headers)
+
+    # Then
+    assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,84 @@
+import pytest_asyncio
+from fastapi import status
+from httpx import AsyncClient
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def populate_posts(db):
+    from src.schemas.account import AccountIn
+    from src.services.account import AccountService
+    from src.schemas.user import UserIn
+    from src.services.user import UserService
+
+    user_service = UserService()
+    await user_service.create(UserIn(name="José da Silva", cpf="12345678910", password="test1234"))
+    await user_service.create(UserIn(name="Maria dos Santos", cpf="12345678911", password="test1234"))
+
+    acc_service = AccountService()
+    for balance in (10, 20, 30):
+        await acc_service.create(AccountIn(user_id=1, balance=balance))
+
+
+async def test_create_accounts_bulk_success(client: AsyncClient, access_token_manager: str, query_counter, monkeypatch):
+    # Given
+    from src.config import settings
+
+    monkeypatch.setattr(settings, "account_bulk_chunk_size", 2)
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    data = [{"user_id": 2, "balance": 1}, {"user_id": 1, "balance": 2}, {"user_id": 2, "balance": 3}]
+    query_counter.reset()
+
+    # When
+    response = await client.post("/accounts/bulk", json=data, headers=headers)
+
+    # Then
+    content = response.json()
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert [(item["id"], item["user_id"], item["balance"]) for item in content] == [(4, 2, 1), (5, 1, 2), (6, 2, 3)]
+    assert query_counter.count == 3  # one user lookup and two insert chunks
+
+
+async def test_create_accounts_bulk_unknown_users_fail(client: AsyncClient, access_token_manager: str):
+    # Given
+    from src.services.account import AccountService
+
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    data = [{"user_id": 9, "balance": 1}, {"user_id": 1, "balance": 2}, {"user_id": 7, "balance": 3}]
+
+    # When
+    response = await client.post("/accounts/bulk", json=data, headers=headers)
+
+    # Then
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json()["detail"] == "User not found: 7, 9"
+    assert len(await AccountService().read_all(limit=10)) == 3
+
+
+async def test_list_accounts_by_ids_keeps_requested_order(client: AsyncClient, access_token_manager: str, query_counter):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    query_counter.reset()
+
+    # When
+    response = await client.get("/accounts/", params={"ids": "3,99,1,3"}, headers=headers)
+
+    # Then
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["id"] for item in response.json()] == [3, 1]
+    assert query_counter.count == 1
+
+
+async def test_list_accounts_by_ids_invalid_fail(client: AsyncClient, access_token_manager: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+
+    # When
+    invalid = await client.get("/accounts/", params={"ids": "1,a"}, headers=headers)
+    too_many = await client.get("/accounts/", params={"ids": ",".join(map(str, range(1001)))}, headers=headers)
+    missing = await client.get("/accounts/", headers=headers)
+
+    # Then
+    assert invalid.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert too_many.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert missing.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -54,4 +54,50 @@ async def test_read_account_not_found_fail(client: AsyncClient, access_token_man
     response = await client.get(f"/accounts/{acc_id}", headers=headers)
 
     # Then
-    assert response.status_code == status.HTTP_404_NOT_FOUND
\ No newline at end of file
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+async def test_read_account_not_modified(client: AsyncClient, access_token_manager: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    first = await client.get("/accounts/1", headers=headers)
+
+    # When
+    response = await client.get("/accounts/1", headers={**headers, "If-None-Match": f'"other", {first.headers["ETag"]}'})
+
+    # Then
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["ETag"] == first.headers["ETag"]
+
+
+async def test_read_account_etag_changes_with_balance(client: AsyncClient, access_token_manager: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    first = await client.get("/accounts/1", headers=headers)
+    await client.post("/transactions/", json={"account_id": 1, "type": "DEPOSIT", "amount": 5}, headers=headers)
+
+    # When
+    response = await client.get("/accounts/1", headers={**headers, "If-None-Match": first.headers["ETag"]})
+
+    # Then
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != first.headers["ETag"]
+    assert response.json()["balance"] == 15
+
+
+async def test_list_accounts_matches_response_model(client: AsyncClient, access_token_manager: str):
+    # Given
+    from pydantic import TypeAdapter
+    from src.services.account import AccountService
+    from src.views.account import AccountOut
+
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    adapter = TypeAdapter(list[AccountOut])
+    expected = adapter.validate_python([dict(record._mapping) for record in await AccountService().read_all(limit=10)])
+
+    # When
+    response = await client.get("/accounts/", params={"limit": 10}, headers=headers)
+
+    # Then
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == adapter.dump_python(expected, mode="json")
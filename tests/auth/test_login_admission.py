@@ -0,0 +1,94 @@
+import pytest_asyncio
+from fastapi import status
+from httpx import AsyncClient
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def populate_users(db):
+    from src.schemas.user import UserIn
+    from src.services.user import UserService
+
+    service = UserService()
+    await service.create(UserIn(name="Test1", cpf="11111111111", password="12345678"))
+    await service.create(UserIn(name="Test2", cpf="22222222222", password="12345678"))
+
+
+async def test_login_limited_per_cpf(client: AsyncClient, monkeypatch):
+    # Given
+    from src.ratelimit import login_cpf_buckets
+
+    monkeypatch.setattr(login_cpf_buckets, "burst", 2)
+    data = {"cpf": "11111111111", "password": "wrong-password"}
+
+    # When
+    attempts = [await client.post("/auth/login", json=data) for _ in range(3)]
+    other = await client.post("/auth/login", json={"cpf": "22222222222", "password": "12345678"})
+
+    # Then
+    assert [response.status_code for response in attempts] == [
+        status.HTTP_401_UNAUTHORIZED,
+        status.HTTP_401_UNAUTHORIZED,
+        status.HTTP_429_TOO_MANY_REQUESTS,
+    ]
+    assert int(attempts[-1].headers["Retry-After"]) >= 1
+    assert other.status_code == status.HTTP_200_OK
+
+
+async def test_login_limited_per_ip(client: AsyncClient, monkeypatch, query_counter):
+    # Given
+    from src.ratelimit import login_ip_buckets
+
+    monkeypatch.setattr(login_ip_buckets, "burst", 2)
+    for cpf in ("11111111111", "22222222222"):
+        await client.post("/auth/login", json={"cpf": cpf, "password": "12345678"})
+    query_counter.reset()
+
+    # When
+    response = await client.post("/auth/login", json={"cpf": "33333333333", "password": "12345678"})
+
+    # Then
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert query_counter.count == 0
+
+
+async def test_login_limited_by_concurrent_verifications(client: AsyncClient, monkeypatch):
+    # Given
+    from src.ratelimit import password_verifications
+
+    monkeypatch.setattr(password_verifications, "limit", 0)
+
+    # When
+    response = await client.post("/auth/login", json={"cpf": "11111111111", "password": "12345678"})
+
+    # Then
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response.headers["Retry-After"] == "1"
+    assert password_verifications.in_flight == 0
+
+
+async def test_login_malformed_cpf_not_tracked(client: AsyncClient):
+    # Given
+    from src.ratelimit import login_cpf_buckets
+
+    # When
+    response = await client.post("/auth/login", json={"cpf": "1" * 10_000, "password": "12345678"})
+
+    # Then
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert len(login_cpf_buckets) == 0
+
+
+def test_token_buckets_memory_is_bounded():
+    # Given
+    from src.ratelimit import TokenBuckets, limiters
+
+    buckets = TokenBuckets("test", rate=1, burst=1, maxsize=2)
+    del limiters["test"]
+
+    # When
+    for key in ("a", "b", "c"):
+        buckets.take(key)
+
+    # Then
+    assert len(buckets) == 2
+    buckets.take("a")  # forgotten, so it starts from a full bucket again
@@ -0,0 +1,87 @@
+import time
+
+import pytest_asyncio
+from fastapi import status
+from httpx import AsyncClient
+
+from src.security.auth import decode_jwt, sign_jwt, token_cache
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def clear_token_cache():
+    token_cache.clear()
+
+
+async def test_token_cache_hit_success(client: AsyncClient, access_token_client: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_client}"}
+
+    # When
+    for _ in range(3):
+        response = await client.get("/users/me", headers=headers)
+
+    # Then
+    assert response.status_code == status.HTTP_200_OK
+    assert token_cache.misses == 1
+    assert token_cache.hits == 2
+
+
+async def test_token_cache_tampered_token_fail():
+    # Given
+    token = sign_jwt(user_id="1", role="CLIENT")["access_token"]
+    await decode_jwt(token)
+    header, payload, signature = token.split(".")
+    tampered = f"{header}.{payload}.{signature[::-1]}"
+
+    # When
+    result = await decode_jwt(tampered)
+
+    # Then
+    assert result is None
+
+
+async def test_token_cache_expired_token_fail(mocker):
+    # Given
+    token = sign_jwt(user_id="1", role="CLIENT")["access_token"]
+    await decode_jwt(token)
+    mocker.patch("src.security.auth.time.time", return_value=time.time() + 60 * 60)
+
+    # When
+    result = await decode_jwt(token)
+
+    # Then
+    assert result is None
+    assert len(token_cache) == 0
+
+
+async def test_token_cache_evicts_least_recently_used(mocker):
+    # Given
+    mocker.patch.object(token_cache, "maxsize", 2)
+    tokens = [sign_jwt(user_id=str(id), role="CLIENT")["access_token"] for id in range(3)]
+
+    # When
+    for token in tokens:
+        await decode_jwt(token)
+
+    # Then
+    assert len(token_cache) == 2
+    assert token_cache.get(tokens[0]) is None
+    assert token_cache.get(tokens[2]) is not None
+
+
+async def test_token_cache_metrics(client: AsyncClient, access_token_client: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_client}"}
+    for _ in range(3):
+        await client.get("/users/me", headers=headers)
+
+    # When
+    response = await client.get("/metrics")
+
+    # Then
+    content = response.text
+
+    assert "# TYPE token_cache_hits_total counter" in content
+    assert "token_cache_hits_total 2" in content
+    assert "token_cache_misses_total 1" in content
+    assert "token_cache_size 1" in content
@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi import status
+from httpx import AsyncClient
+
+import pytest_asyncio
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def populate_users(db):
+    from src.schemas.user import UserIn
+    from src.services.user import UserService
+
+    service = UserService()
+    await service.create(UserIn(name="Test1", cpf="22222222222", password="12345678"))
+
+
+async def login(client: AsyncClient) -> dict:
+    response = await client.post("/auth/login", json={"cpf": "22222222222", "password": "12345678"})
+    return response.json()
+
+
+def bearer(token: str) -> dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def test_logout_revokes_tokens(client: AsyncClient) -> None:
+    # Given
+    tokens = await login(client)
+    before = await client.get("/users/me", headers=bearer(tokens["access_token"]))
+
+    # When
+    response = await client.post("/auth/logout", json={"refresh_token": tokens["refresh_token"]}, headers=bearer(tokens["access_token"]))
+
+    # Then
+    after = await client.get("/users/me", headers=bearer(tokens["access_token"]))
+    refreshed = await client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+
+    assert before.status_code == status.HTTP_200_OK
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert after.status_code == status.HTTP_401_UNAUTHORIZED
+    assert refreshed.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+async def test_role_change_revokes_tokens(client: AsyncClient, access_token_manager: str) -> None:
+    # Given
+    tokens = await login(client)
+
+    # When
+    await client.patch("/users/1/role", json={"role_id": "MANAGER"}, headers=bearer(access_token_manager))
+
+    # Then
+    revoked = await client.get("/users/me", headers=bearer(tokens["access_token"]))
+    fresh = await login(client)
+    users = await client.get("/users/", params={"limit": 10}, headers=bearer(fresh["access_token"]))
+
+    assert revoked.status_code == status.HTTP_401_UNAUTHORIZED
+    assert users.status_code == status.HTTP_200_OK
+
+
+async def test_refresh_rotates_tokens(client: AsyncClient, query_counter) -> None:
+    # Given
+    tokens = await login(client)
+    query_counter.reset()
+
+    # When
+    response = await client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+
+    # Then
+    statements = query_counter.count
+    refreshed = response.json()
+    me = await client.get("/users/me", headers=bearer(refreshed["access_token"]))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert statements == 1  # the refresh token's revocation; no password check
+    assert refreshed["refresh_token"] != tokens["refresh_token"]
+    assert me.status_code == status.HTTP_200_OK
+
+
+async def test_refresh_token_reuse_revokes_everything(client: AsyncClient) -> None:
+    # Given
+    tokens = await login(client)
+    refreshed = (await client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})).json()
+
+    # When
+    reused = await client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+
+    # Then
+    me = await client.get("/users/me", headers=bearer(refreshed["access_token"]))
+    rotated = await client.post("/auth/refresh", json={"refresh_token": refreshed["refresh_token"]})
+
+    assert reused.status_code == status.HTTP_401_UNAUTHORIZED
+    assert me.status_code == status.HTTP_401_UNAUTHORIZED
+    assert rotated.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+async def test_refresh_token_is_not_an_access_token(client: AsyncClient) -> None:
+    # Given
+    tokens = await login(client)
+
+    # When
+    response = await client.get("/users/me", headers=bearer(tokens["refresh_token"]))
+
+    # Then
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+async def test_sync_loads_revocations_and_prunes_expired() -> None:
+    # Given
+    from src.database import database
+    from src.models.revoked_token import revoked_tokens
+    from src.services.revocation import revocations
+
+    now = datetime.now(timezone.utc)
+    await database.execute_many(revoked_tokens.insert(), [
+        {"jti": "live", "revoked_at": now, "expires_at": now + timedelta(minutes=5)},
+        {"jti": "expired", "revoked_at": now - timedelta(minutes=10), "expires_at": now - timedelta(minutes=5)},
+        {"jti": "cutoff", "sub": "7", "revoked_at": now, "expires_at": now + timedelta(minutes=5)},
+    ])
+
+    # When
+    await revocations.sync()
+
+    # Then
+    remaining = {record.jti for record in await database.fetch_all(revoked_tokens.select())}
+
+    assert revocations.is_revoked("live", "1", now.timestamp())
+    assert not revocations.is_revoked("expired", "1", now.timestamp())
+    assert revocations.is_revoked("other", "7", now.timestamp() - 1)
+    assert not revocations.is_revoked("other", "7", now.timestamp() + 1)
+    assert remaining == {"live", "cutoff"}
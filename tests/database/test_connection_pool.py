@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from src.database import ConnectionLimiter
+from src.exceptions import DatabasePoolTimeoutError
+
+
+async def test_connection_limiter_times_out_when_saturated():
+    # Given
+    limiter = ConnectionLimiter(max_size=1, timeout=0.05)
+    limiter.reset()
+    await limiter.acquire()
+
+    # When
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    waiters = limiter.waiters
+
+    # Then
+    with pytest.raises(DatabasePoolTimeoutError):
+        await waiter
+    assert waiters == 1
+    assert limiter.waiters == 0
+    assert limiter.in_use == 1
+
+
+async def test_connection_limiter_hands_over_released_slot():
+    # Given
+    limiter = ConnectionLimiter(max_size=1, timeout=1)
+    limiter.reset()
+    await limiter.acquire()
+
+    # When
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    limiter.release()
+    await waiter
+
+    # Then
+    assert limiter.in_use == 1
+    assert limiter.waiters == 0
+
+
+async def test_saturated_pool_returns_service_unavailable(client: AsyncClient, access_token_manager: str, monkeypatch):
+    # Given
+    from src.database import database
+
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    monkeypatch.setattr(database.limiter, "_semaphore", asyncio.Semaphore(1))
+    monkeypatch.setattr(database.limiter, "timeout", 0.05)
+    held, release = asyncio.Event(), asyncio.Event()
+
+    async def hold_connection():
+        async with database.connection():
+            held.set()
+            await release.wait()
+
+    holder = asyncio.create_task(hold_connection())
+    await held.wait()
+
+    # When
+    response = await client.get("/accounts/1", headers=headers)
+    release.set()
+    await holder
+
+    # Then
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "1"
+
+
+async def test_pool_metrics(client: AsyncClient):
+    # When
+    response = await client.get("/metrics")
+
+    # Then
+    assert "db_pool_max_size 20" in response.text
+    assert "db_pool_in_use 0" in response.text
+    assert "db_pool_waiters 0" in response.text
@@ -0,0 +1,158 @@
+import asyncio
+import contextvars
+import os
+
+import pytest
+import pytest_asyncio
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def populate_posts(db):
+    from src.database import database
+    from src.models.account import accounts
+
+    await database.execute(accounts.insert().values(user_id=1, balance=10))
+
+sqlite_only = pytest.mark.skipif(not os.environ["DATABASE_URL"].startswith("sqlite"), reason="SQLite only")
+
+
+async def insert_account(balance: float) -> int:
+    from src.database import database
+    from src.models.account import accounts
+
+    return await database.execute(accounts.insert().values(user_id=1, balance=balance))
+
+
+async def count_accounts() -> int:
+    from src.database import database
+
+    return (await database.fetch_one("select count(id) as total from accounts")).total
+
+
+async def test_writer_failing_job_releases_connection():
+    # Given
+    from src.database import database
+    from src.writer import writer
+
+    async def failing_job():
+        await insert_account(1)
+        raise ValueError("boom")
+
+    # When
+    with pytest.raises(ValueError):
+        await writer.run(failing_job)
+
+    # Then
+    assert database.limiter.in_use == 0
+    assert await count_accounts() == 1
+
+
+@sqlite_only
+async def test_writer_batches_concurrent_jobs_into_one_commit():
+    # Given
+    from src.writer import db_writer_batch_size, writer
+
+    before = list(db_writer_batch_size.series.get((), [0] * (len(db_writer_batch_size.buckets) + 2)))
+
+    # When
+    ids = await asyncio.gather(*[writer.run(lambda: insert_account(1)) for _ in range(10)])
+
+    # Then
+    after = db_writer_batch_size.series[()]
+
+    assert len(set(ids)) == 10
+    assert sum(after[:-1]) - sum(before[:-1]) == 1
+    assert after[-1] - before[-1] == 10
+    assert await count_accounts() == 11
+
+
+async def test_writer_rolls_back_only_the_failing_job():
+    # Given
+    from src.writer import writer
+
+    async def failing_job():
+        await insert_account(1)
+        raise ValueError("boom")
+
+    # When
+    results = await asyncio.gather(
+        writer.run(lambda: insert_account(1)),
+        writer.run(failing_job),
+        writer.run(lambda: insert_account(1)),
+        return_exceptions=True,
+    )
+
+    # Then
+    assert isinstance(results[1], ValueError)
+    assert all(isinstance(result, int) for result in (results[0], results[2]))
+    assert await count_accounts() == 3
+
+
+async def test_writer_runs_nested_jobs_inline():
+    # Given
+    from src.writer import writer
+
+    async def outer_job():
+        return await writer.run(lambda: insert_account(1))
+
+    # When
+    id = await asyncio.wait_for(writer.run(outer_job), timeout=5)
+
+    # Then
+    assert id is not None
+    assert await count_accounts() == 2
+
+
+async def test_writer_after_commit_waits_for_outermost_transaction():
+    # Given
+    from src.writer import writer
+
+    calls = []
+
+    async def count_committed():
+        # Read on a connection of its own, so only committed rows are seen.
+        return await asyncio.create_task(count_accounts(), context=contextvars.Context())
+
+    async def record(name):
+        calls.append((name, await count_committed()))
+
+    async def nested_job():
+        await insert_account(1)
+        await writer.after_commit(record, "nested")
+
+    async def failing_job():
+        await writer.after_commit(record, "failed")
+        raise ValueError("boom")
+
+    async def outer_job():
+        await writer.run(nested_job)
+        with pytest.raises(ValueError):
+            await writer.run(failing_job)
+        calls.append(("outer", None))
+
+    # When
+    await writer.run(outer_job)
+    await writer.after_commit(record, "outside")
+
+    # Then
+    assert calls == [("outer", None), ("nested", 2), ("outside", 2)]
+
+
+@sqlite_only
+async def test_sqlite_pragmas_applied_to_every_connection():
+    # Given
+    from src.config import settings
+    from src.database import database
+
+    # When
+    async with database.connection() as connection:
+        journal_mode = await connection.fetch_val("PRAGMA journal_mode")
+        synchronous = await connection.fetch_val("PRAGMA synchronous")
+        busy_timeout = await connection.fetch_val("PRAGMA busy_timeout")
+        mmap_size = await connection.fetch_val("PRAGMA mmap_size")
+
+    # Then
+    assert journal_mode == "wal"
+    assert synchronous == 1  # NORMAL
+    assert busy_timeout == settings.sqlite_busy_timeout_ms
+    assert mmap_size == settings.sqlite_mmap_size
@@ -0,0 +1,33 @@
+from fastapi import status
+from httpx import AsyncClient
+
+
+async def test_metrics_route_template_labels(client: AsyncClient, access_token_manager: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    await client.get("/accounts/1", headers=headers)
+    await client.get("/accounts/2", headers=headers)
+
+    # When
+    response = await client.get("/metrics")
+
+    # Then
+    content = response.text
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_requests_total{route="/accounts/{id}",method="GET",status="404"}' in content
+    assert 'http_request_duration_seconds_bucket{route="/accounts/{id}",method="GET",status="404",le="+Inf"}' in content
+    assert "http_requests_in_flight 1" in content
+    assert "/accounts/1" not in content
+
+
+async def test_metrics_unmatched_route(client: AsyncClient):
+    # Given
+    await client.get("/does-not-exist")
+
+    # When
+    response = await client.get("/metrics")
+
+    # Then
+    assert 'http_requests_total{route="<unmatched>",method="GET",status="404"}' in response.text
@@ -0,0 +1,89 @@
+import logging
+
+from fastapi import status
+from httpx import AsyncClient
+
+
+async def test_query_count_header(client: AsyncClient, access_token_manager: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+
+    # When
+    response = await client.get("/accounts/1", headers=headers)
+
+    # Then
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert int(response.headers["X-Query-Count"]) >= 1
+
+
+async def test_query_count_header_hidden_in_production(client: AsyncClient, access_token_manager: str, monkeypatch):
+    # Given
+    from src.config import settings
+
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    monkeypatch.setattr(settings, "environment", "production")
+
+    # When
+    response = await client.get("/accounts/1", headers=headers)
+
+    # Then
+    assert "X-Query-Count" not in response.headers
+
+
+async def test_slow_query_log(client: AsyncClient, access_token_manager: str, monkeypatch, caplog):
+    # Given
+    from src.config import settings
+
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    monkeypatch.setattr(settings, "slow_query_threshold_ms", 0)
+
+    # When
+    with caplog.at_level(logging.WARNING, logger="src.database"):
+        await client.get("/accounts/1", headers=headers)
+
+    # Then
+    messages = [record.getMessage() for record in caplog.records if record.name == "src.database"]
+
+    assert any("Slow query" in message and "FROM accounts" in message for message in messages)
+    assert not any("12345678" in message for message in messages)
+
+
+async def test_statement_metrics(client: AsyncClient, access_token_manager: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    await client.get("/accounts/1", headers=headers)
+
+    # When
+    response = await client.get("/metrics")
+
+    # Then
+    assert 'db_statement_duration_seconds_count{operation="fetch_one"}' in response.text
+    assert 'db_statement_rows_bucket{operation="fetch_one",le="1"}' in response.text
+
+
+async def test_execute_many_and_iterate_are_recorded(db, monkeypatch, caplog):
+    # Given
+    from src.config import settings
+    from src.database import QueryStats, database, db_statement_rows, query_stats
+    from src.models.account import accounts
+
+    monkeypatch.setattr(settings, "slow_query_threshold_ms", 0)
+    stats = QueryStats()
+    token = query_stats.set(stats)
+    before = list(db_statement_rows.series.get(("iterate",), [0] * (len(db_statement_rows.buckets) + 2)))
+
+    # When
+    with caplog.at_level(logging.WARNING, logger="src.database"):
+        await database.execute_many(accounts.insert(), [{"user_id": 1, "balance": 10} for _ in range(3)])
+        rows = [record async for record in database.iterate(accounts.select())]
+    query_stats.reset(token)
+
+    # Then
+    messages = [record.getMessage() for record in caplog.records if record.name == "src.database"]
+    after = db_statement_rows.series[("iterate",)]
+
+    assert len(rows) == 3
+    assert stats.count == 2
+    assert after[-1] - before[-1] == 3  # rows summed over the iteration
+    assert any("Slow query" in message and "3 rows" in message and "INSERT INTO accounts" in message for message in messages)
+    assert any("Slow query" in message and "3 rows" in message and "FROM accounts" in message for message in messages)
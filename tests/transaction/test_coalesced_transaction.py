@@ -0,0 +1,149 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from fastapi import status
+from httpx import AsyncClient
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def populate_posts(db, monkeypatch):
+    from src.schemas.account import AccountIn
+    from src.services.account import AccountService
+    from src.schemas.user import UserIn
+    from src.services.user import UserService
+    from src.services.transaction import coalescer
+
+    monkeypatch.setattr(coalescer, "enabled", True)
+
+    user_service = UserService()
+    await user_service.create(UserIn(name="José da Silva", cpf="12345678910", password="test1234"))
+
+    acc_service = AccountService()
+    await acc_service.create(AccountIn(user_id="1", balance=10))
+
+
+def transaction(type: str, amount: float, account_id: int = 1):
+    from src.schemas.transaction import TransactionIn
+
+    return TransactionIn(account_id=account_id, type=type, amount=amount)
+
+
+async def read_balance(account_id: int = 1) -> float:
+    from src.database import database
+    from src.models.account import accounts
+
+    return float(await database.fetch_val(accounts.select().with_only_columns(accounts.c.balance).where(accounts.c.id == account_id)))
+
+
+async def test_coalesced_deposits_applied_in_one_flush():
+    # Given
+    from src.coalescer import coalesced_batch_size
+    from src.services.transaction import TransactionService
+
+    service = TransactionService()
+    before = list(coalesced_batch_size.series.get((), [0] * (len(coalesced_batch_size.buckets) + 2)))
+
+    # When
+    records = await asyncio.gather(*[service.create(transaction("DEPOSIT", 1)) for _ in range(20)])
+
+    # Then
+    after = coalesced_batch_size.series[()]
+
+    assert len({record.id for record in records}) == 20
+    assert all(record.account_id == 1 and float(record.amount) == 1 for record in records)
+    assert sum(after[:-1]) - sum(before[:-1]) == 1
+    assert after[-1] - before[-1] == 20
+    assert await read_balance() == 30
+
+
+async def test_coalesced_withdrawals_keep_arrival_order():
+    # Given
+    from src.exceptions import BusinessError
+    from src.services.transaction import TransactionService
+
+    service = TransactionService()
+
+    # When
+    results = await asyncio.gather(
+        service.create(transaction("WITHDRAWAL", 5)),
+        service.create(transaction("WITHDRAWAL", 10)),
+        service.create(transaction("DEPOSIT", 100)),
+        service.create(transaction("WITHDRAWAL", 10)),
+        return_exceptions=True,
+    )
+
+    # Then
+    assert isinstance(results[1], BusinessError)
+    assert [record.type for record in (results[0], results[2], results[3])] == ["WITHDRAWAL", "DEPOSIT", "WITHDRAWAL"]
+    assert results[0].id < results[2].id < results[3].id
+    assert await read_balance() == 95
+
+
+async def test_coalesced_unknown_account_fail():
+    # Given
+    from src.exceptions import AccountNotFoundError
+    from src.services.transaction import TransactionService
+
+    service = TransactionService()
+
+    # When / Then
+    with pytest.raises(AccountNotFoundError):
+        await service.create(transaction("DEPOSIT", 1, account_id=9))
+
+
+async def test_coalesced_flush_when_batch_is_full(monkeypatch):
+    # Given
+    from src.coalescer import coalesced_batch_size
+    from src.services.transaction import TransactionService, coalescer
+
+    monkeypatch.setattr(coalescer, "batch_size", 2)
+    monkeypatch.setattr(coalescer, "window", 60)
+    service = TransactionService()
+    before = list(coalesced_batch_size.series.get((), [0] * (len(coalesced_batch_size.buckets) + 2)))
+
+    # When
+    await asyncio.wait_for(asyncio.gather(*[service.create(transaction("DEPOSIT", 1)) for _ in range(4)]), timeout=5)
+
+    # Then
+    after = coalesced_batch_size.series[()]
+
+    assert sum(after[:-1]) - sum(before[:-1]) == 2
+    assert await read_balance() == 14
+
+
+async def test_coalesced_transaction_endpoint(client: AsyncClient, access_token_manager: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    deposit = {"account_id": 1, "type": "DEPOSIT", "amount": 100}
+    withdrawal = {"account_id": 1, "type": "WITHDRAWAL", "amount": 1000}
+
+    # When
+    responses = await asyncio.gather(
+        client.post("/transactions/", json=deposit, headers=headers),
+        client.post("/transactions/", json=withdrawal, headers=headers),
+    )
+
+    # Then
+    assert responses[0].status_code == status.HTTP_201_CREATED
+    assert responses[1].status_code == status.HTTP_400_BAD_REQUEST
+    assert await read_balance() == 110
+
+
+async def test_coalesced_transaction_endpoint_with_idempotency_key(client: AsyncClient, access_token_manager: str):
+    # Given
+    from src.controllers.transaction import idempotency_service
+
+    idempotency_service.clear()
+    headers = {"Authorization": f"Bearer {access_token_manager}", "Idempotency-Key": "abc"}
+    deposit = {"account_id": 1, "type": "DEPOSIT", "amount": 5}
+
+    # When
+    first = await asyncio.wait_for(client.post("/transactions/", json=deposit, headers=headers), timeout=5)
+    second = await asyncio.wait_for(client.post("/transactions/", json=deposit, headers=headers), timeout=5)
+
+    # Then
+    assert first.status_code == second.status_code == status.HTTP_201_CREATED
+    assert second.json() == first.json()
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert await read_balance() == 15
@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest_asyncio
 from fastapi import status
 from httpx import AsyncClient
@@ -34,6 +36,20 @@ async def test_create_transaction_deposit_success(client: AsyncClient, access_to
     assert content["id"] is not None
 
 
+async def test_create_transaction_statement_count(client: AsyncClient, access_token_manager: str, query_counter):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    data = {"account_id": 1, "type": "DEPOSIT", "amount": 100}
+    query_counter.reset()
+
+    # When
+    response = await client.post("/transactions/", json=data, headers=headers)
+
+    # Then
+    assert response.status_code == status.HTTP_201_CREATED
+    assert query_counter.count <= 2  # conditional balance update + insert ... returning
+
+
 async def test_create_transaction_withdrawal_success(client: AsyncClient, access_token_manager: str):
     # Given
     headers = {"Authorization": f"Bearer {access_token_manager}"}
@@ -57,4 +73,36 @@ async def test_create_transaction_not_authenticated_fail(client: AsyncClient):
     response = await client.post("/transactions/", json=data, headers={})
 
     # Then
-    assert response.status_code == status.HTTP_401_UNAUTHORIZED
\ No newline at end of file
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+async def test_create_transaction_concurrent_deposits_success(client: AsyncClient, access_token_manager: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    data = {"account_id": 2, "type": "DEPOSIT", "amount": 1}
+
+    # When
+    responses = await asyncio.gather(*[client.post("/transactions/", json=data, headers=headers) for _ in range(50)])
+
+    # Then
+    response = await client.get("/accounts/2", headers=headers)
+
+    assert all(r.status_code == status.HTTP_201_CREATED for r in responses)
+    assert response.json()["balance"] == 150
+
+
+async def test_create_transaction_concurrent_withdrawals_keep_balance(client: AsyncClient, access_token_manager: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    data = {"account_id": 2, "type": "WITHDRAWAL", "amount": 3}
+
+    # When
+    responses = await asyncio.gather(*[client.post("/transactions/", json=data, headers=headers) for _ in range(50)])
+
+    # Then
+    response = await client.get("/accounts/2", headers=headers)
+    status_codes = [r.status_code for r in responses]
+
+    assert status_codes.count(status.HTTP_201_CREATED) == 33
+    assert status_codes.count(status.HTTP_400_BAD_REQUEST) == 17
+    assert response.json()["balance"] == 1
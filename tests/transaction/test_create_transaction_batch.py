@@ -0,0 +1,114 @@
+import pytest_asyncio
+from fastapi import status
+from httpx import AsyncClient
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def populate_posts(db):
+    from src.schemas.account import AccountIn
+    from src.services.account import AccountService
+    from src.schemas.user import UserIn
+    from src.services.user import UserService
+
+    user_service = UserService()
+    await user_service.create(UserIn(name="José da Silva", cpf="12345678910", password="test1234"))
+    await user_service.create(UserIn(name="Maria dos Santos", cpf="12345678911", password="test1234"))
+
+    acc_service = AccountService()
+    await acc_service.create(AccountIn(user_id="1", balance=10))
+    await acc_service.create(AccountIn(user_id="2", balance=100))
+
+
+async def test_create_transaction_batch_success(client: AsyncClient, access_token_manager: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    data = [
+        {"account_id": 1, "type": "WITHDRAWAL", "amount": 15},
+        {"account_id": 1, "type": "DEPOSIT", "amount": 10},
+        {"account_id": 1, "type": "WITHDRAWAL", "amount": 15},
+        {"account_id": 2, "type": "WITHDRAWAL", "amount": 40},
+        {"account_id": 9, "type": "DEPOSIT", "amount": 10},
+    ]
+
+    # When
+    response = await client.post("/transactions/batch", json=data, headers=headers)
+
+    # Then
+    content = response.json()
+    account_1 = (await client.get("/accounts/1", headers=headers)).json()
+    account_2 = (await client.get("/accounts/2", headers=headers)).json()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["success"] for item in content] == [False, True, True, True, False]
+    assert content[0]["detail"] == "Operation not carried out due to lack of balance"
+    assert content[4]["detail"] == "Account not found"
+    assert content[0]["id"] is None
+    assert [content[i]["id"] for i in (1, 2, 3)] == sorted(content[i]["id"] for i in (1, 2, 3))
+    assert all(content[i]["timestamp"] for i in (1, 2, 3))
+    assert account_1["balance"] == 5
+    assert account_2["balance"] == 60
+
+
+async def test_create_transaction_batch_exact_running_balance_success(client: AsyncClient, access_token_manager: str):
+    # Given
+    from src.schemas.account import AccountIn
+    from src.services.account import AccountService
+
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    await AccountService().update(1, AccountIn(user_id="1", balance=0.3))
+    data = [
+        {"account_id": 1, "type": "WITHDRAWAL", "amount": 0.1},
+        {"account_id": 1, "type": "WITHDRAWAL", "amount": 0.2},
+    ]
+
+    # When
+    response = await client.post("/transactions/batch", json=data, headers=headers)
+
+    # Then
+    account = (await client.get("/accounts/1", headers=headers)).json()
+
+    assert [item["success"] for item in response.json()] == [True, True]
+    assert account["balance"] == 0
+
+
+async def test_create_transaction_batch_registers_entries(client: AsyncClient, access_token_manager: str):
+    # Given
+    from src.database import database
+    from src.models.transaction import transactions
+
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    data = [{"account_id": 2, "type": "DEPOSIT", "amount": 1} for _ in range(20)]
+
+    # When
+    response = await client.post("/transactions/batch", json=data, headers=headers)
+
+    # Then
+    entries = await database.fetch_all(transactions.select().where(transactions.c.account_id == 2))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(entries) == 20
+
+
+async def test_create_transaction_batch_too_large_fail(client: AsyncClient, access_token_manager: str):
+    # Given
+    from src.controllers.transaction import MAX_BATCH_TRANSACTIONS
+
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    data = [{"account_id": 1, "type": "DEPOSIT", "amount": 1}] * (MAX_BATCH_TRANSACTIONS + 1)
+
+    # When
+    response = await client.post("/transactions/batch", json=data, headers=headers)
+
+    # Then
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+async def test_create_transaction_batch_not_authenticated_fail(client: AsyncClient):
+    # Given
+    data = [{"account_id": 1, "type": "DEPOSIT", "amount": 10}]
+
+    # When
+    response = await client.post("/transactions/batch", json=data, headers={})
+
+    # Then
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
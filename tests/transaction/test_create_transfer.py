@@ -0,0 +1,104 @@
+import asyncio
+import random
+
+import pytest_asyncio
+from fastapi import status
+from httpx import AsyncClient
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def populate_posts(db):
+    from src.schemas.account import AccountIn
+    from src.services.account import AccountService
+    from src.schemas.user import UserIn
+    from src.services.user import UserService
+
+    user_service = UserService()
+    await user_service.create(UserIn(name="José da Silva", cpf="12345678910", password="test1234"))
+    await user_service.create(UserIn(name="Maria dos Santos", cpf="12345678911", password="test1234"))
+
+    acc_service = AccountService()
+    await acc_service.create(AccountIn(user_id="1", balance=10))
+    await acc_service.create(AccountIn(user_id="2", balance=100))
+    await acc_service.create(AccountIn(user_id="2", balance=50))
+
+
+async def test_create_transfer_success(client: AsyncClient, access_token_manager: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    data = {"source_account_id": 2, "destination_account_id": 1, "amount": 30}
+
+    # When
+    response = await client.post("/transactions/transfer", json=data, headers=headers)
+
+    # Then
+    content = response.json()
+    source = (await client.get("/accounts/2", headers=headers)).json()
+    destination = (await client.get("/accounts/1", headers=headers)).json()
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert content["debit"]["type"] == "TRANSFER_OUT"
+    assert content["credit"]["type"] == "TRANSFER_IN"
+    assert source["balance"] == 70
+    assert destination["balance"] == 40
+
+
+async def test_create_transfer_lack_of_balance_fail(client: AsyncClient, access_token_manager: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    data = {"source_account_id": 1, "destination_account_id": 2, "amount": 30}
+
+    # When
+    response = await client.post("/transactions/transfer", json=data, headers=headers)
+
+    # Then
+    destination = (await client.get("/accounts/2", headers=headers)).json()
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == "Operation not carried out due to lack of balance"
+    assert destination["balance"] == 100
+
+
+async def test_create_transfer_account_not_found_fail(client: AsyncClient, access_token_manager: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    data = {"source_account_id": 2, "destination_account_id": 9, "amount": 30}
+
+    # When
+    response = await client.post("/transactions/transfer", json=data, headers=headers)
+
+    # Then
+    source = (await client.get("/accounts/2", headers=headers)).json()
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert source["balance"] == 100
+
+
+async def test_create_transfer_same_account_fail(client: AsyncClient, access_token_manager: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    data = {"source_account_id": 2, "destination_account_id": 2, "amount": 30}
+
+    # When
+    response = await client.post("/transactions/transfer", json=data, headers=headers)
+
+    # Then
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+async def test_create_transfer_concurrent_conserves_money(client: AsyncClient, access_token_manager: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    rng = random.Random(42)
+    pairs = [rng.sample([1, 2, 3], 2) for _ in range(60)]
+    data = [{"source_account_id": source, "destination_account_id": destination, "amount": rng.randint(1, 20)} for source, destination in pairs]
+
+    # When
+    responses = await asyncio.gather(*[client.post("/transactions/transfer", json=item, headers=headers) for item in data])
+
+    # Then
+    balances = [(await client.get(f"/accounts/{id}", headers=headers)).json()["balance"] for id in (1, 2, 3)]
+
+    assert {r.status_code for r in responses} <= {status.HTTP_201_CREATED, status.HTTP_400_BAD_REQUEST}
+    assert sum(balances) == 160
+    assert all(balance >= 0 for balance in balances)
@@ -0,0 +1,128 @@
+import csv
+import io
+import json
+import tracemalloc
+
+import pytest_asyncio
+import sqlalchemy as sa
+from fastapi import status
+from httpx import AsyncClient
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def populate_posts(db):
+    from src.schemas.account import AccountIn
+    from src.services.account import AccountService
+    from src.schemas.user import UserIn
+    from src.services.user import UserService
+    from src.schemas.transaction import TransactionIn
+    from src.services.transaction import TransactionService
+
+    user_service = UserService()
+    await user_service.create(UserIn(name="José da Silva", cpf="12345678910", password="test1234"))
+    await user_service.create(UserIn(name="Maria dos Santos", cpf="12345678911", password="test1234"))
+
+    acc_service = AccountService()
+    await acc_service.create(AccountIn(user_id="1", balance=10))
+    await acc_service.create(AccountIn(user_id="2", balance=100))
+
+    transaction_service = TransactionService()
+    await transaction_service.create(TransactionIn(account_id=1, type="DEPOSIT", amount=100))
+    await transaction_service.create(TransactionIn(account_id=1, type="WITHDRAWAL", amount=30))
+
+
+@pytest_asyncio.fixture
+async def owner_headers(client: AsyncClient) -> dict[str, str]:
+    response = await client.post("/auth/login", json={"cpf": "12345678910", "password": "test1234"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def test_export_transaction_csv_success(client: AsyncClient, owner_headers: dict[str, str]):
+    # Given
+    id = 1
+
+    # When
+    response = await client.get(f"/transactions/{id}/export", params={"format": "csv"}, headers=owner_headers)
+
+    # Then
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+    assert [row["type"] for row in rows] == ["DEPOSIT", "WITHDRAWAL"]
+    assert float(rows[1]["amount"]) == 30
+
+
+async def test_export_transaction_ndjson_success(client: AsyncClient, owner_headers: dict[str, str]):
+    # Given
+    id = 1
+
+    # When
+    response = await client.get(f"/transactions/{id}/export", params={"format": "ndjson"}, headers=owner_headers)
+
+    # Then
+    rows = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [row["type"] for row in rows] == ["DEPOSIT", "WITHDRAWAL"]
+    assert rows[0]["account_id"] == 1
+
+
+async def test_export_transaction_forbidden(client: AsyncClient, owner_headers: dict[str, str]):
+    # Given
+    id = 2
+
+    # When
+    response = await client.get(f"/transactions/{id}/export", headers=owner_headers)
+
+    # Then
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+async def test_export_transaction_not_found_fail(client: AsyncClient, access_token_manager: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    id = 7
+
+    # When
+    response = await client.get(f"/transactions/{id}/export", headers=headers)
+
+    # Then
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+async def test_export_transaction_large_history_constant_memory():
+    # Given
+    from src.database import engine
+    from src.schemas.transaction import ExportFormat
+    from src.services.transaction import TransactionService
+
+    rows = 200_000
+    if engine.dialect.name == "postgresql":
+        seed = (
+            "INSERT INTO transactions (account_id, type, amount, timestamp) "
+            "SELECT 2, 'DEPOSIT', 1, TIMESTAMPTZ '2024-01-01' + n * INTERVAL '1 second' FROM generate_series(1, :rows) AS n"
+        )
+    else:
+        seed = (
+            "WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < :rows) "
+            "INSERT INTO transactions (account_id, type, amount, timestamp) "
+            "SELECT 2, 'DEPOSIT', 1, datetime('2024-01-01', '+' || n || ' seconds') FROM seq"
+        )
+    with engine.begin() as connection:
+        connection.execute(sa.text(seed), {"rows": rows})
+
+    # When
+    lines = 0
+    tracemalloc.start()
+    try:
+        async for chunk in TransactionService().export_by_account_id(2, ExportFormat.CSV):
+            lines += chunk.count(b"\n")
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # Then
+    # Buffering the whole history would take hundreds of MB; streaming stays within a few chunks.
+    assert lines == rows + 1
+    assert peak < 10 * 1024 * 1024
@@ -0,0 +1,135 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest_asyncio
+from fastapi import status
+from httpx import AsyncClient
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def populate_posts(db):
+    from src.controllers.transaction import idempotency_service
+    from src.schemas.account import AccountIn
+    from src.services.account import AccountService
+    from src.schemas.user import UserIn
+    from src.services.user import UserService
+
+    idempotency_service.clear()
+
+    user_service = UserService()
+    await user_service.create(UserIn(name="José da Silva", cpf="12345678910", password="test1234"))
+
+    acc_service = AccountService()
+    await acc_service.create(AccountIn(user_id="1", balance=100))
+
+
+async def test_create_transaction_idempotent_replay_success(client: AsyncClient, access_token_manager: str, query_counter):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}", "Idempotency-Key": "deposit-1"}
+    data = {"account_id": 1, "type": "DEPOSIT", "amount": 50}
+    first = await client.post("/transactions/", json=data, headers=headers)
+    query_counter.reset()
+
+    # When
+    second = await client.post("/transactions/", json=data, headers=headers)
+    queries = query_counter.count
+
+    # Then
+    account = (await client.get("/accounts/1", headers=headers)).json()
+
+    assert first.status_code == second.status_code == status.HTTP_201_CREATED
+    assert second.json() == first.json()
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert queries == 0
+    assert account["balance"] == 150
+
+
+async def test_create_transaction_idempotent_replay_from_database(client: AsyncClient, access_token_manager: str):
+    # Given
+    from src.controllers.transaction import idempotency_service
+
+    headers = {"Authorization": f"Bearer {access_token_manager}", "Idempotency-Key": "deposit-1"}
+    data = {"account_id": 1, "type": "DEPOSIT", "amount": 50}
+    first = await client.post("/transactions/", json=data, headers=headers)
+    idempotency_service.clear()
+
+    # When
+    second = await client.post("/transactions/", json=data, headers=headers)
+
+    # Then
+    assert second.json() == first.json()
+    assert second.headers["Idempotent-Replayed"] == "true"
+
+
+async def test_create_transaction_idempotent_concurrent_duplicates(client: AsyncClient, access_token_manager: str):
+    # Given
+    from src.database import database
+    from src.models.transaction import transactions
+
+    headers = {"Authorization": f"Bearer {access_token_manager}", "Idempotency-Key": "withdrawal-1"}
+    data = {"account_id": 1, "type": "WITHDRAWAL", "amount": 10}
+
+    # When
+    responses = await asyncio.gather(*[client.post("/transactions/", json=data, headers=headers) for _ in range(10)])
+
+    # Then
+    entries = await database.fetch_all(transactions.select())
+
+    assert all(r.status_code == status.HTTP_201_CREATED for r in responses)
+    assert len({r.json()["id"] for r in responses}) == 1
+    assert len(entries) == 1
+
+
+async def test_create_transaction_idempotent_longest_key_success(client: AsyncClient, access_token_manager: str):
+    # Given
+    from src.database import database
+    from src.models.idempotency import idempotency_keys
+
+    headers = {"Authorization": f"Bearer {access_token_manager}", "Idempotency-Key": "k" * 255}
+    data = {"account_id": 1, "type": "DEPOSIT", "amount": 50}
+
+    # When
+    first = await client.post("/transactions/", json=data, headers=headers)
+    second = await client.post("/transactions/", json=data, headers=headers)
+
+    # Then
+    keys = await database.fetch_all(idempotency_keys.select().with_only_columns(idempotency_keys.c.key))
+
+    assert first.status_code == second.status_code == status.HTTP_201_CREATED
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert [len(record.key) for record in keys] == [64]
+
+
+async def test_create_transaction_idempotent_key_reused_fail(client: AsyncClient, access_token_manager: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}", "Idempotency-Key": "deposit-1"}
+    await client.post("/transactions/", json={"account_id": 1, "type": "DEPOSIT", "amount": 50}, headers=headers)
+
+    # When
+    response = await client.post("/transactions/", json={"account_id": 1, "type": "DEPOSIT", "amount": 60}, headers=headers)
+
+    # Then
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+async def test_purge_expired_idempotency_keys():
+    # Given
+    from src.database import database
+    from src.models.idempotency import idempotency_keys
+    from src.services.idempotency import IdempotencyService
+
+    now = datetime.now(timezone.utc)
+    rows = [
+        {"key": f"key-{i}", "request_hash": "x", "response": {}, "expires_at": now + timedelta(hours=-1 if i < 25 else 1)}
+        for i in range(30)
+    ]
+    await database.execute(idempotency_keys.insert().values(rows))
+
+    # When
+    purged = await IdempotencyService().purge_expired(batch_size=10)
+
+    # Then
+    remaining = await database.fetch_all(idempotency_keys.select())
+
+    assert purged == 25
+    assert len(remaining) == 5
@@ -56,4 +56,99 @@ async def test_read_transaction_not_found_fail(client: AsyncClient, access_token
     response = await client.get(f"/transactions/{id}", headers=headers)
 
     # Then
-    assert response.status_code == status.HTTP_404_NOT_FOUND
\ No newline at end of file
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+async def test_read_transaction_pages_success(client: AsyncClient):
+    # Given
+    from src.schemas.transaction import TransactionIn
+    from src.services.transaction import TransactionService
+
+    transaction_service = TransactionService()
+    for _ in range(24):
+        await transaction_service.create(TransactionIn(account_id=1, type="DEPOSIT", amount=1))
+
+    response = await client.post("/auth/login", json={"cpf": "12345678910", "password": "test1234"})
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    # When
+    pages = []
+    cursor = None
+    while True:
+        params = {"limit": 10, **({"after": cursor} if cursor else {})}
+        response = await client.get("/transactions/1", params=params, headers=headers)
+        pages.append(response.json())
+        cursor = pages[-1]["next_cursor"]
+        if not cursor:
+            break
+
+    # Then
+    ids = [item["id"] for page in pages for item in page["items"]]
+
+    assert [len(page["items"]) for page in pages] == [10, 10, 5]
+    assert ids == list(range(1, 26))
+
+
+async def test_read_transaction_invalid_cursor_fail(client: AsyncClient):
+    # Given
+    response = await client.post("/auth/login", json={"cpf": "12345678910", "password": "test1234"})
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    # When
+    response = await client.get("/transactions/1", params={"after": "not-a-cursor"}, headers=headers)
+
+    # Then
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+async def test_read_transaction_page_matches_response_model(client: AsyncClient, access_token_manager: str):
+    # Given
+    from pydantic import TypeAdapter
+    from src.services.transaction import TransactionService
+    from src.views.transaction import TransactionPageOut
+
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    manager = {"user_id": "3", "role": "MANAGER"}
+    page = await TransactionService().read_all_by_account_id(1, manager, limit=10)
+    expected = TypeAdapter(TransactionPageOut).validate_python({
+        "items": [dict(record._mapping) for record in page["items"]],
+        "next_cursor": page["next_cursor"],
+    })
+
+    # When
+    response = await client.get("/transactions/1", params={"limit": 10}, headers=headers)
+
+    # Then
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == expected.model_dump(mode="json")
+
+
+async def test_read_transaction_not_modified(client: AsyncClient, access_token_manager: str, query_counter):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    first = await client.get("/transactions/1", headers=headers)
+    query_counter.reset()
+
+    # When
+    response = await client.get("/transactions/1", headers={**headers, "If-None-Match": first.headers["ETag"]})
+
+    # Then
+    assert first.headers["ETag"].startswith('W/"')
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["ETag"] == first.headers["ETag"]
+    assert response.content == b""
+    assert query_counter.count == 1  # the account lookup only
+
+
+async def test_read_transaction_etag_changes_with_new_transaction(client: AsyncClient, access_token_manager: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    first = await client.get("/transactions/1", headers=headers)
+    await client.post("/transactions/", json={"account_id": 1, "type": "WITHDRAWAL", "amount": 5}, headers=headers)
+
+    # When
+    response = await client.get("/transactions/1", headers={**headers, "If-None-Match": first.headers["ETag"]})
+
+    # Then
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != first.headers["ETag"]
+    assert len(response.json()["items"]) == 2
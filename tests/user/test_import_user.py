@@ -0,0 +1,120 @@
+import json
+
+import pytest_asyncio
+from fastapi import status
+from httpx import AsyncClient
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def populate_posts(db):
+    from src.schemas.user import UserIn
+    from src.services.user import UserService
+
+    user_service = UserService()
+    await user_service.create(UserIn(name="José da Silva", cpf="12345678910", password="test1234"))
+
+
+def events(response) -> list[dict]:
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+async def test_import_users_csv_success(client: AsyncClient, access_token_manager: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}", "Content-Type": "text/csv"}
+    content = (
+        "name,cpf,password\n"
+        "Maria dos Santos,22222222222,maria1234\n"
+        "Duplicated,12345678910,test1234\n"
+        "Invalid,123,test1234\n"
+        "Repeated,22222222222,test1234\n"
+        "João Souza,33333333333,joao1234\n"
+    )
+
+    # When
+    response = await client.post("/users/import", content=content, headers=headers)
+    login = await client.post("/auth/login", json={"cpf": "33333333333", "password": "joao1234"})
+
+    # Then
+    result = events(response)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [(event["row"], event["error"]) for event in result[:-1]] == [
+        (2, "cpf already registered"),
+        (3, "cpf: String should match pattern '^\\d{11}$'"),
+        (4, "cpf repeated in this import"),
+    ]
+    assert result[-1] == {"progress": {"processed": 5, "created": 2, "rejected": 3}}
+    assert login.status_code == status.HTTP_200_OK
+
+
+async def test_import_users_ndjson_streams_progress_per_chunk(client: AsyncClient, access_token_manager: str, monkeypatch):
+    # Given
+    from src.config import settings
+
+    monkeypatch.setattr(settings, "user_import_chunk_size", 2)
+    headers = {"Authorization": f"Bearer {access_token_manager}", "Content-Type": "application/x-ndjson"}
+    rows = [json.dumps({"name": f"User {i}", "cpf": f"{i:011d}", "password": "pass1234"}) for i in range(5)]
+    content = "\n".join([*rows, "{not json"]) + "\n"
+
+    # When
+    response = await client.post("/users/import?format=ndjson", content=content, headers=headers)
+
+    # Then
+    result = events(response)
+    progress = [event["progress"] for event in result if "progress" in event]
+
+    assert [item["processed"] for item in progress] == [2, 4, 6]
+    assert progress[-1] == {"processed": 6, "created": 5, "rejected": 1}
+    assert result[-2]["row"] == 6
+    assert result[-2]["error"].startswith("invalid JSON")
+
+
+async def test_import_users_invalid_utf8_rejects_row(client: AsyncClient, access_token_manager: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}", "Content-Type": "text/csv"}
+    content = b"name,cpf,password\r\nMaria dos Santos,22222222222,maria1234\r\nJo\xe3o,33333333333,joao1234\r\n"
+
+    # When
+    response = await client.post("/users/import", content=content, headers=headers)
+
+    # Then
+    result = events(response)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert result[0]["row"] == 2
+    assert result[0]["error"].startswith("invalid UTF-8")
+    assert result[-1] == {"progress": {"processed": 2, "created": 1, "rejected": 1}}
+
+
+async def test_import_users_forbidden(client: AsyncClient, access_token_client: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_client}", "Content-Type": "text/csv"}
+
+    # When
+    response = await client.post("/users/import", content="name,cpf,password\n", headers=headers)
+
+    # Then
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+async def test_import_users_cli(tmp_path, capsys):
+    # Given
+    from src.cli import import_users, parse_args
+    from src.database import database
+    from src.services.user import UserService
+
+    path = tmp_path / "partners.csv"
+    path.write_text("name,cpf,password\nMaria dos Santos,22222222222,maria1234\nDuplicated,12345678910,test1234\n")
+
+    # When
+    status_code = await import_users(parse_args(["import-users", str(path)]))
+    await database.connect()  # the command disconnects when it is done
+
+    # Then
+    out, err = capsys.readouterr()
+
+    assert status_code == 1
+    assert json.loads(out) == {"row": 2, "cpf": "12345678910", "error": "cpf already registered"}
+    assert "processed 2, created 1, rejected 1" in err
+    assert await UserService.count(2) == 1
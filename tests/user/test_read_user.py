@@ -54,4 +54,26 @@ async def test_read_user_not_found_fail(client: AsyncClient, access_token_manage
     response = await client.get(f"/accounts/{acc_id}", headers=headers)
 
     # Then
-    assert response.status_code == status.HTTP_404_NOT_FOUND
\ No newline at end of file
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+async def test_list_users_matches_response_model(client: AsyncClient, access_token_manager: str):
+    # Given
+    from pydantic import TypeAdapter
+    from src.services.user import UserService
+    from src.views.user import UserOut
+
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    manager = {"user_id": "3", "role": "MANAGER"}
+    adapter = TypeAdapter(list[UserOut])
+    expected = adapter.validate_python([dict(record._mapping) for record in await UserService().read_all(manager, limit=10)])
+
+    # When
+    response = await client.get("/users/", params={"limit": 10}, headers=headers)
+
+    # Then
+    content = response.json()
+
+    assert response.headers["content-type"] == "application/json"
+    assert content == adapter.dump_python(expected, mode="json")
+    assert all("password" not in user for user in content)
@@ -34,4 +34,80 @@ async def test_update_user_not_found_fail(client: AsyncClient, access_token_mana
     response = await client.patch(f"/posts/{id}", json=data, headers=headers)
 
     # Then
-    assert response.status_code == status.HTTP_404_NOT_FOUND
\ No newline at end of file
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+async def test_update_user_success(client: AsyncClient, access_token_manager: str, query_counter):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    data = {"name": "Joaquim", "password": "test5678"}
+    id = 1
+    query_counter.reset()
+
+    # When
+    response = await client.patch(f"/users/{id}", json=data, headers=headers)
+
+    # Then
+    content = response.json()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert content["name"] == "Joaquim"
+    assert query_counter.count == 1
+
+
+async def test_update_user_missing_user_fail(client: AsyncClient, access_token_manager: str, query_counter):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    data = {"name": "Joaquim", "password": "test5678"}
+    id = 9
+    query_counter.reset()
+
+    # When
+    response = await client.patch(f"/users/{id}", json=data, headers=headers)
+
+    # Then
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert query_counter.count == 1
+
+
+async def test_update_user_role_success(client: AsyncClient, access_token_manager: str, query_counter):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    data = {"role_id": "MANAGER"}
+    id = 2
+    query_counter.reset()
+
+    # When
+    response = await client.patch(f"/users/{id}/role", json=data, headers=headers)
+
+    # Then
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["role_id"] == "MANAGER"
+    assert query_counter.count == 2  # the update and the revocation of the user's tokens
+
+
+async def test_update_user_forbidden(client: AsyncClient, access_token_client: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_client}"}
+    data = {"name": "Joaquim", "password": "test5678"}
+    id = 1
+
+    # When
+    response = await client.patch(f"/users/{id}", json=data, headers=headers)
+
+    # Then
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+async def test_update_user_refreshes_cached_me(client: AsyncClient, access_token_manager: str):
+    # Given
+    headers = {"Authorization": f"Bearer {access_token_manager}"}
+    me = (await client.get("/users/me", headers=headers)).json()
+
+    # When
+    await client.patch(f"/users/{me['id']}", json={"name": "Joaquim", "password": "12345678"}, headers=headers)
+    response = await client.get("/users/me", headers=headers)
+
+    # Then
+    assert me["name"] == "Test1"
+    assert response.json()["name"] == "Joaquim"